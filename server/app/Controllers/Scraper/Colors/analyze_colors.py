@@ -29,7 +29,7 @@ def format_color_analysis_data(results):
     )
     return prompt
 
-def get_chatgpt_analysis(prompt):
+def get_chatgpt_analysis(prompt, timeout=None):
     """Send a prompt to ChatGPT and get the response."""
     try:
         response = openai.ChatCompletion.create(
@@ -39,20 +39,24 @@ def get_chatgpt_analysis(prompt):
                 {"role": "user", "content": prompt}
             ],
             max_tokens=500,  # Adjust as needed
-            temperature=0.7  # Adjust for creativity; lower values are more focused
+            temperature=0.7,  # Adjust for creativity; lower values are more focused
+            request_timeout=timeout  # None waits as long as the API client allows
         )
         return response.choices[0].message['content'].strip()
     except Exception as e:
         logging.error(f"Error interacting with ChatGPT: {e}")
         return "Error: Unable to get response from ChatGPT."
 
-def analyze_color_results(results):
-    """Analyze color results using ChatGPT."""
+def analyze_color_results(results, deadline=None):
+    """Analyze color results using ChatGPT, skipping the call once the scrape's deadline has passed."""
+    if deadline is not None and deadline.expired():
+        deadline.skip('ChatGPT analysis')
+        return "Analysis skipped: the time budget for this scrape ran out."
     try:
         # Format the data into a prompt for ChatGPT
         prompt = format_color_analysis_data(results)
         logging.info("Sending prompt to ChatGPT...")
-        analysis = get_chatgpt_analysis(prompt)
+        analysis = get_chatgpt_analysis(prompt, deadline.wait_timeout() if deadline is not None else None)
         logging.info("Received analysis from ChatGPT:")
         logging.info(analysis)
         return analysis
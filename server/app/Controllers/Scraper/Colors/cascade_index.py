@@ -0,0 +1,299 @@
+import os
+import re
+import logging
+import soupsieve
+from app.Controllers.Scraper.style_sources import get_style_sources
+from .extractions.color_literals import scan_color_literals
+
+# Share of an element's weight kept by declarations that only apply in an interaction state
+STATE_WEIGHT = float(os.getenv('SCRAPER_CASCADE_STATE_WEIGHT', '0.25'))
+# Pseudo-classes that never match a static DOM; their rules are matched without them and discounted
+STATE_PATTERN = re.compile(r':(?:hover|active|focus-visible|focus-within|focus|visited|target)(?![-\w])', re.IGNORECASE)
+# Pseudo-elements style a part of the element itself, so they are dropped before matching
+PSEUDO_ELEMENT_PATTERN = re.compile(r'::[-\w]+(?:\([^)]*\))?|:(?:before|after|first-line|first-letter)(?![-\w])', re.IGNORECASE)
+LEGACY_PSEUDO_ELEMENTS = {'before', 'after', 'first-line', 'first-letter'}
+# Pseudo-classes whose specificity is that of their most specific argument
+SELECTOR_LIST_PSEUDO_CLASSES = {'not', 'is', 'matches', 'has', '-webkit-any', '-moz-any'}
+# Values that leave the parent's color or background showing through
+SHOW_THROUGH_VALUES = {'inherit', 'transparent', 'none', 'unset', 'currentcolor'}
+# Contexts whose value reaches descendants: text color inherits, a background shows behind its children
+PROPAGATED_CONTEXTS = ('color', 'background-color')
+IDENT_PATTERN = re.compile(r'-?(?:[_a-zA-Z]|\\.)(?:[-\w]|\\.)*|\*')
+# Id, class and tag names in a compound selector, with CSS escapes such as Tailwind's md\:flex
+COMPOUND_NAME_PATTERN = re.compile(r'([#.]?)(-?(?:[_a-zA-Z]|\\.)(?:[-\w]|\\.)*)')
+IMPORTANT_PATTERN = re.compile(r'!\s*important\s*$', re.IGNORECASE)
+INLINE_SPECIFICITY = (1, 0, 0, 0)
+# Declarations matched between deadline checks in add_css
+DEADLINE_CHECK_INTERVAL = 256
+
+
+def split_selector_list(selector):
+    """Split a selector list on its top-level commas."""
+    parts = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(selector):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth = max(depth - 1, 0)
+        elif char == ',' and depth == 0:
+            parts.append(selector[start:i].strip())
+            start = i + 1
+    parts.append(selector[start:].strip())
+    return [part for part in parts if part]
+
+
+def _closing_paren(selector, start):
+    depth = 0
+    for i in range(start, len(selector)):
+        if selector[i] == '(':
+            depth += 1
+        elif selector[i] == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(selector)
+
+
+def selector_specificity(selector):
+    """Return the (inline, id, class, type) specificity of one complex selector."""
+    ids = classes = types = 0
+    i = 0
+    length = len(selector)
+    while i < length:
+        char = selector[i]
+        if char == '#':
+            match = IDENT_PATTERN.match(selector, i + 1)
+            ids += 1
+            i = match.end() if match else i + 1
+        elif char == '.':
+            match = IDENT_PATTERN.match(selector, i + 1)
+            classes += 1
+            i = match.end() if match else i + 1
+        elif char == '[':
+            end = selector.find(']', i)
+            classes += 1
+            i = length if end == -1 else end + 1
+        elif char == ':':
+            is_element = selector.startswith('::', i)
+            match = IDENT_PATTERN.match(selector, i + (2 if is_element else 1))
+            name = match.group(0).lower() if match else ''
+            i = match.end() if match else i + 1
+            arguments = None
+            if i < length and selector[i] == '(':
+                end = _closing_paren(selector, i)
+                arguments = selector[i + 1:end]
+                i = end + 1
+            if is_element or name in LEGACY_PSEUDO_ELEMENTS:
+                types += 1
+            elif name == 'where':
+                pass
+            elif name in SELECTOR_LIST_PSEUDO_CLASSES and arguments is not None:
+                inner = [selector_specificity(part) for part in split_selector_list(arguments)]
+                if inner:
+                    _, inner_ids, inner_classes, inner_types = max(inner)
+                    ids += inner_ids
+                    classes += inner_classes
+                    types += inner_types
+            else:
+                classes += 1
+        else:
+            match = IDENT_PATTERN.match(selector, i) if (i == 0 or not selector[i - 1].isalnum()) else None
+            if match:
+                if match.group(0) != '*':
+                    types += 1
+                i = match.end()
+            else:
+                i += 1
+    return (0, ids, classes, types)
+
+
+def matchable_selector(selector):
+    """Drop pseudo-elements and state pseudo-classes; return (selector, is_state) for matching against the DOM."""
+    stripped = PSEUDO_ELEMENT_PATTERN.sub('', selector)
+    stripped, states = STATE_PATTERN.subn('', stripped)
+    # "a:hover" becomes "a", while "nav :hover" and "ul > :focus" need a universal selector left
+    if not stripped.strip() or stripped[-1].isspace() or stripped.rstrip()[-1] in '>+~':
+        stripped += '*'
+    return stripped.strip(), states > 0
+
+
+def rightmost_compound(selector):
+    """Return the last compound selector, the part that must match the element itself."""
+    depth = 0
+    for i in range(len(selector) - 1, -1, -1):
+        char = selector[i]
+        if char in ')]':
+            depth += 1
+        elif char in '([':
+            depth -= 1
+        elif depth == 0 and (char.isspace() or char in '>+~'):
+            return selector[i + 1:]
+    return selector
+
+
+def cascade_context(prop):
+    """Group properties that paint the same thing, so shorthands and longhands compete in one cascade."""
+    if prop == 'color':
+        return 'color'
+    if prop.startswith('background'):
+        return 'background-color'
+    if prop.startswith('border') and not prop.endswith('radius'):
+        return 'border-color'
+    return prop
+
+
+def color_declarations(css_text):
+    """Group the color literals of a CSS source by declaration: (selector, context, colors, value, position)."""
+    declarations = []
+    current = None
+    for literal in scan_color_literals(css_text):
+        if current is None or current[4] != literal.position:
+            current = (literal.selector, cascade_context(literal.property), [], literal.value, literal.position)
+            declarations.append(current)
+        if literal.color:
+            current[2].append(literal.color)
+    return declarations
+
+
+class CascadeIndex:
+    """Color declarations of a page resolved against its DOM.
+
+    Every selector is matched once, through a per-selector cache. Each element keeps the winning
+    declaration per context by (!important, specificity, document order), separately for its normal
+    and its interaction states. A color's weight is the number of elements it ends up painting:
+    text colors inherit and backgrounds show behind descendants, so body styles outweigh a
+    rule that only applies while one button is hovered.
+
+    Elements and style attributes come from the page's StyleSources traversal when one is given.
+    Once the deadline expires, add_css stops matching and the index is marked abandoned.
+    """
+
+    def __init__(self, soup, sources=None, deadline=None):
+        if sources is None or sources.elements is None:
+            sources = get_style_sources(soup)
+        self.sources = sources
+        self.deadline = deadline
+        self.abandoned = False
+        self.elements = sources.elements
+        self.positions = {}
+        self.by_id = {}
+        self.by_class = {}
+        self.by_tag = {}
+        for i, element in enumerate(self.elements):
+            self.positions[id(element)] = i
+            self.by_tag.setdefault(element.name, []).append(i)
+            element_id = element.get('id')
+            if element_id:
+                self.by_id.setdefault(element_id, []).append(i)
+            for class_name in element.get('class') or ():
+                self.by_class.setdefault(class_name, []).append(i)
+        self.all_positions = range(len(self.elements))
+        self.match_cache = {}
+        self.cache_hits = 0
+        self.winners = {}  # (element index, context, is_state) -> (rank, colors, value)
+
+    def _candidates(self, selector):
+        """Elements that could match, narrowed by the id, class or tag of the rightmost compound."""
+        compound = re.sub(r'\([^()]*\)|\[[^\]]*\]|(?<!\\)::?[-\w]+', '', rightmost_compound(selector))
+        candidate_lists = []
+        for match in COMPOUND_NAME_PATTERN.finditer(compound):
+            prefix, name = match.group(1), re.sub(r'\\(.)', r'\1', match.group(2))
+            if prefix == '#':
+                candidate_lists.append(self.by_id.get(name, ()))
+            elif prefix == '.':
+                candidate_lists.append(self.by_class.get(name, ()))
+            elif match.start() == 0:
+                candidate_lists.append(self.by_tag.get(name.lower(), ()))
+        if not candidate_lists:
+            return self.all_positions
+        return min(candidate_lists, key=len)
+
+    def match(self, selector):
+        """Return the indexes of the elements one matchable selector applies to, cached per selector."""
+        cached = self.match_cache.get(selector)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        matched = ()
+        candidates = self._candidates(selector)
+        if candidates:
+            try:
+                compiled = soupsieve.compile(selector)
+                matched = tuple(i for i in candidates if compiled.match(self.elements[i]))
+            except Exception as e:
+                logging.debug(f"Selector {selector!r} cannot be matched: {e}")
+        self.match_cache[selector] = matched
+        return matched
+
+    def _offer(self, position, context, is_state, rank, colors, value):
+        key = (position, context, is_state)
+        current = self.winners.get(key)
+        if current is None or rank > current[0]:
+            self.winners[key] = (rank, colors, value)
+
+    def add_css(self, css_text, order):
+        """Resolve every color declaration of a stylesheet or <style> tag against the DOM.
+
+        order is the source's place in document order, a tuple from the page's stylesheet slots,
+        so sources can be added in whatever order their downloads finish.
+        """
+        if self.abandoned:
+            return
+        for count, (selector_list, context, colors, value, position) in enumerate(color_declarations(css_text)):
+            if count % DEADLINE_CHECK_INTERVAL == 0 and self.deadline is not None and self.deadline.expired():
+                self.deadline.skip('color weights')
+                self.abandoned = True
+                return
+            if not selector_list or selector_list.startswith('@') or '&' in selector_list:
+                continue
+            important = bool(IMPORTANT_PATTERN.search(value))
+            for selector in split_selector_list(selector_list):
+                specificity = selector_specificity(selector)
+                matchable, is_state = matchable_selector(selector)
+                rank = (important, specificity, order, position)
+                for element_position in self.match(matchable):
+                    self._offer(element_position, context, is_state, rank, colors, value)
+
+    def add_inline_styles(self):
+        """Resolve style attributes, which beat every selector unless a rule is !important."""
+        declarations_by_style = {}
+        for position, inline_style in zip(self.sources.inline_positions, self.sources.inline_styles):
+            style = inline_style.style
+            if style not in declarations_by_style:
+                declarations_by_style[style] = color_declarations(style)
+            for _, context, colors, value, offset in declarations_by_style[style]:
+                important = bool(IMPORTANT_PATTERN.search(value))
+                self._offer(position, context, False, (important, INLINE_SPECIFICITY, (), offset), colors, value)
+
+    def color_weights(self):
+        """Return {color: weight}, the number of elements each color paints, with interaction states discounted."""
+        weights = {}
+
+        def add(colors, weight):
+            for color in colors:
+                weights[color] = weights.get(color, 0) + weight
+
+        for (position, context, is_state), (_, colors, _) in self.winners.items():
+            if is_state:
+                add(colors, STATE_WEIGHT)
+            elif context not in PROPAGATED_CONTEXTS:
+                add(colors, 1)
+
+        # Elements come in document order, so a parent's effective value is known before its children
+        for context in PROPAGATED_CONTEXTS:
+            effective = [None] * len(self.elements)
+            for position, element in enumerate(self.elements):
+                winner = self.winners.get((position, context, False))
+                if winner is None or (not winner[1] and winner[2].lower() in SHOW_THROUGH_VALUES):
+                    parent = self.positions.get(id(element.parent))
+                    effective[position] = effective[parent] if parent is not None else None
+                else:
+                    effective[position] = winner[1]
+                if effective[position]:
+                    add(effective[position], 1)
+
+        logging.debug(f"Cascade resolved {len(self.match_cache)} selectors ({self.cache_hits} cache hits) "
+                      f"over {len(self.elements)} elements into {len(weights)} weighted colors")
+        return {color: round(weight, 2) for color, weight in weights.items()}
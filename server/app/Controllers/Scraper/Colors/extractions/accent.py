@@ -1,37 +1,36 @@
 import re
 import logging
 from bs4 import BeautifulSoup
-import requests 
+import requests
+from app.Controllers.Scraper.http_client import http_get
 import colorsys
+from .color_literals import scan_color_literals, declared_colors
+from app.Controllers.Scraper.style_sources import get_style_sources
 
-def extract_accent_colors_from_css(css):
-    logging.debug("Extracting accent colors from CSS")
-    accent_color_pattern = re.compile(r'(color|background-color)\s*:\s*(#[0-9a-fA-F]{3,6}|rgba?\([0-9,\s]+\)|hsla?\([0-9,\s%]+\))', re.IGNORECASE)
-    colors = accent_color_pattern.findall(css)
-    
+def extract_accent_colors_from_literals(literals):
     accent_colors = set()
-    for context, color in colors:
+    for context, color in declared_colors(literals):
         # Assuming accent colors are typically brighter and more saturated
         if is_accent_color(color):
             accent_colors.add(color)
-    
     return accent_colors
 
-def extract_accent_colors_from_inline_styles(soup):
+def extract_accent_colors_from_css(css):
+    logging.debug("Extracting accent colors from CSS")
+    return extract_accent_colors_from_literals(scan_color_literals(css))
+
+def extract_accent_colors_from_inline_styles(sources):
     logging.debug("Extracting accent colors from inline styles")
     accent_colors = set()
-    for element in soup.find_all(style=True):
-        style = element.get('style')
-        if style:
-            colors = extract_accent_colors_from_css(style)
-            accent_colors.update(colors)
+    for style in get_style_sources(sources).style_counts:
+        colors = extract_accent_colors_from_css(style)
+        accent_colors.update(colors)
     return accent_colors
 
-def extract_accent_colors_from_styles(soup):
+def extract_accent_colors_from_styles(sources):
     logging.debug("Extracting accent colors from <style> tags")
     accent_colors = set()
-    for style in soup.find_all('style'):
-        css = style.text
+    for css in get_style_sources(sources).style_blocks:
         colors = extract_accent_colors_from_css(css)
         accent_colors.update(colors)
     return accent_colors
@@ -39,7 +38,7 @@ def extract_accent_colors_from_styles(soup):
 def fetch_accent_colors_from_external_css(css_url, headers):
     logging.debug(f"Fetching external CSS: {css_url}")
     try:
-        response = requests.get(css_url, headers=headers)
+        response = http_get(css_url, headers=headers)
         response.raise_for_status()
         css_text = response.text
         accent_colors = extract_accent_colors_from_css(css_text)
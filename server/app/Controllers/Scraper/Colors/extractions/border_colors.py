@@ -1,30 +1,29 @@
-import re
 import logging
 import requests
+from app.Controllers.Scraper.http_client import http_get
 from bs4 import BeautifulSoup
+from .color_literals import scan_color_literals, declared_colors
+from app.Controllers.Scraper.style_sources import get_style_sources
+
+def extract_border_colors_from_literals(literals):
+    return {color for context, color in declared_colors(literals) if context == 'border-color'}
 
 def extract_border_colors_from_css(css):
     logging.debug("Extracting border colors from CSS")
-    border_color_pattern = re.compile(r'border-color\s*:\s*(#[0-9a-fA-F]{3,6}|rgba?\([0-9,\s]+\)|hsla?\([0-9,\s%]+\))', re.IGNORECASE)
-    colors = border_color_pattern.findall(css)
-    
-    return set(colors)
+    return extract_border_colors_from_literals(scan_color_literals(css))
 
-def extract_border_colors_from_inline_styles(soup):
+def extract_border_colors_from_inline_styles(sources):
     logging.debug("Extracting border colors from inline styles")
     border_colors = set()
-    for element in soup.find_all(style=True):
-        style = element.get('style')
-        if style:
-            colors = extract_border_colors_from_css(style)
-            border_colors.update(colors)
+    for style in get_style_sources(sources).style_counts:
+        colors = extract_border_colors_from_css(style)
+        border_colors.update(colors)
     return border_colors
 
-def extract_border_colors_from_styles(soup):
+def extract_border_colors_from_styles(sources):
     logging.debug("Extracting border colors from <style> tags")
     border_colors = set()
-    for style in soup.find_all('style'):
-        css = style.text
+    for css in get_style_sources(sources).style_blocks:
         colors = extract_border_colors_from_css(css)
         border_colors.update(colors)
     return border_colors
@@ -32,7 +31,7 @@ def extract_border_colors_from_styles(soup):
 def fetch_border_colors_from_external_css(css_url, headers):
     logging.debug(f"Fetching external CSS: {css_url}")
     try:
-        response = requests.get(css_url, headers=headers)
+        response = http_get(css_url, headers=headers)
         response.raise_for_status()
         css_text = response.text
         colors = extract_border_colors_from_css(css_text)
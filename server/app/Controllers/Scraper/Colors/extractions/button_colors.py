@@ -1,33 +1,34 @@
-import re
+import logging
+from .color_literals import scan_color_literals
+from app.Controllers.Scraper.style_sources import get_style_sources
 
-def extract_button_colors_from_inline_styles(soup):
+def extract_button_colors_from_literals(literals):
+    """
+    Select the raw background-color values from scanned CSS declarations.
+    """
+    return {literal.value for literal in literals if literal.property.endswith('background-color')}
+
+def extract_button_colors_from_inline_styles(sources):
     """
     Extract button colors from inline styles.
     """
     button_colors = set()
-    for tag in soup.find_all(style=True):
-        style = tag.get('style')
-        colors = re.findall(r'background-color:\s*([^;]+);?', style, re.IGNORECASE)
-        button_colors.update(colors)
+    for style in get_style_sources(sources).style_counts:
+        button_colors.update(extract_button_colors_from_css(style))
     return button_colors
 
-def extract_button_colors_from_styles(soup):
+def extract_button_colors_from_styles(sources):
     """
     Extract button colors from <style> tags.
     """
     button_colors = set()
-    style_tags = soup.find_all('style')
-    for style in style_tags:
-        css_text = style.get_text()
-        colors = re.findall(r'background-color:\s*([^;]+);?', css_text, re.IGNORECASE)
-        button_colors.update(colors)
+    for css_text in get_style_sources(sources).style_blocks:
+        button_colors.update(extract_button_colors_from_css(css_text))
     return button_colors
 
 def extract_button_colors_from_css(css_text):
     """
     Extract button colors from external CSS text.
     """
-    button_colors = set()
-    colors = re.findall(r'background-color:\s*([^;]+);?', css_text, re.IGNORECASE)
-    button_colors.update(colors)
-    return button_colors
+    logging.debug("Extracting button colors from CSS")
+    return extract_button_colors_from_literals(scan_color_literals(css_text))
@@ -0,0 +1,56 @@
+import re
+import logging
+from collections import namedtuple
+from app.Controllers.Scraper.css_parser import iter_declarations
+from app.Controllers.Scraper.extraction_cache import memoize_css
+
+# The color literal syntax every color extractor has always matched
+COLOR_LITERAL_PATTERN = re.compile(r'#[0-9a-fA-F]{3,6}|rgba?\([0-9,\s]+\)|hsla?\([0-9,\s%]+\)', re.IGNORECASE)
+
+# leading is True when the literal is the first thing in the value, as in "color: #fff"
+ColorLiteral = namedtuple('ColorLiteral', ['selector', 'property', 'value', 'color', 'position', 'leading'])
+
+
+@memoize_css
+def scan_color_literals(css_text):
+    """Tokenize CSS once and return a ColorLiteral for every color literal in a declaration value.
+
+    Declarations of a *color property or holding a gradient but no literal still get one record
+    with color None, so filters that read raw values (buttons, gradients) share the same pass.
+    """
+    logging.debug("Scanning CSS for color literals")
+    return color_literals_from_declarations(iter_declarations(css_text))
+
+
+def color_literals_from_declarations(declarations):
+    """Return the ColorLiteral records of already parsed declarations, as scan_color_literals does for text."""
+    literals = []
+    for declaration in declarations:
+        selector, prop, value, position = declaration
+        found = False
+        for match in COLOR_LITERAL_PATTERN.finditer(value):
+            literals.append(ColorLiteral(selector, prop, value, match.group(0), position, match.start() == 0))
+            found = True
+        if not found and (prop.endswith('color') or 'gradient' in value):
+            literals.append(ColorLiteral(selector, prop, value, None, position, False))
+    return literals
+
+
+def color_context(prop):
+    """Map a property to the context the color extractors report: color, background-color or border-color."""
+    if prop.endswith('background-color'):
+        return 'background-color'
+    if prop.endswith('border-color'):
+        return 'border-color'
+    if prop.endswith('color'):
+        return 'color'
+    return None
+
+
+def declared_colors(literals):
+    """Yield (context, color) for every *color declaration whose value starts with a color literal."""
+    for literal in literals:
+        if literal.leading:
+            context = color_context(literal.property)
+            if context:
+                yield context, literal.color
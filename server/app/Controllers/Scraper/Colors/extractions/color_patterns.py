@@ -1,38 +1,41 @@
-import re
 import logging
 from collections import Counter
+from .color_literals import scan_color_literals
+from app.Controllers.Scraper.style_sources import get_style_sources
+
+def extract_color_patterns_from_literals(literals):
+    """
+    Counts every color literal in the scanned declarations.
+    """
+    return Counter(literal.color for literal in literals if literal.color)
 
 def extract_color_patterns_from_css(css):
     """
     Extracts recurring color patterns from CSS.
     """
     logging.debug("Extracting color patterns from CSS")
-    color_pattern = re.compile(r'(#[0-9a-fA-F]{3,6}|rgba?\([0-9,\s]+\)|hsla?\([0-9,\s%]+\))', re.IGNORECASE)
-    colors = color_pattern.findall(css)
-    color_counter = Counter(colors)
-    return color_counter
+    return extract_color_patterns_from_literals(scan_color_literals(css))
 
-def extract_color_patterns_from_inline_styles(soup):
+def extract_color_patterns_from_inline_styles(sources):
     """
-    Extracts recurring color patterns from inline styles in HTML soup.
+    Extracts recurring color patterns from inline styles in the page, weighted by how many
+    elements share each style attribute.
     """
     logging.debug("Extracting color patterns from inline styles")
     color_counter = Counter()
-    for element in soup.find_all(style=True):
-        style = element.get('style')
-        if style:
-            colors = extract_color_patterns_from_css(style)
-            color_counter.update(colors)
+    for style, count in get_style_sources(sources).style_counts.items():
+        colors = extract_color_patterns_from_css(style)
+        for color, occurrences in colors.items():
+            color_counter[color] += occurrences * count
     return color_counter
 
-def extract_color_patterns_from_styles(soup):
+def extract_color_patterns_from_styles(sources):
     """
-    Extracts recurring color patterns from <style> tags in HTML soup.
+    Extracts recurring color patterns from <style> tags in the page.
     """
     logging.debug("Extracting color patterns from <style> tags")
     color_counter = Counter()
-    for style in soup.find_all('style'):
-        css = style.text
+    for css in get_style_sources(sources).style_blocks:
         colors = extract_color_patterns_from_css(css)
         color_counter.update(colors)
     return color_counter
@@ -1,7 +1,8 @@
 import re
 from bs4 import BeautifulSoup
+from app.Controllers.Scraper.style_sources import get_style_sources
 
-def extract_feedback_colors(soup):
+def extract_feedback_colors(sources):
     """
     Extracts error and success colors from both inline styles and <style> tags based on common naming conventions.
     """
@@ -23,18 +24,18 @@ def extract_feedback_colors(soup):
                 colors.update(background_matches)
         return colors
 
+    sources = get_style_sources(sources)
+
     # Extract from inline styles
-    for tag in soup.find_all(style=True):
-        style_content = tag['style']
+    for style_content in sources.style_counts:
         if any(indicator in style_content.lower() for indicator in error_indicators):
             error_colors.update(parse_colors(style_content, error_indicators))
         if any(indicator in style_content.lower() for indicator in success_indicators):
             success_colors.update(parse_colors(style_content, success_indicators))
 
     # Extract from <style> tags
-    style_tags = soup.find_all('style')
-    for style in style_tags:
-        css_text = style.get_text().lower()
+    for css_text in sources.style_blocks:
+        css_text = css_text.lower()
         error_colors.update(parse_colors(css_text, error_indicators))
         success_colors.update(parse_colors(css_text, success_indicators))
 
@@ -1,11 +1,12 @@
-import re
 import logging
 import requests
+from app.Controllers.Scraper.http_client import http_get
+from .color_literals import scan_color_literals, declared_colors
 
 def fetch_external_css(css_url, headers):
     logging.debug(f"Fetching external CSS: {css_url}")
     try:
-        response = requests.get(css_url, headers=headers)
+        response = http_get(css_url, headers=headers)
         response.raise_for_status()
         css_text = response.text
         return css_text
@@ -15,11 +16,8 @@ def fetch_external_css(css_url, headers):
 
 def extract_colors_from_css(css_text):
     logging.debug("Extracting colors from CSS text")
-    color_pattern = re.compile(r'(color|background-color|border-color)\s*:\s*(#[0-9a-fA-F]{3,6}|rgba?\([0-9,\s]+\)|hsla?\([0-9,\s%]+\))', re.IGNORECASE)
-    colors = color_pattern.findall(css_text)
-    
     color_dict = {}
-    for context, color in colors:
+    for context, color in declared_colors(scan_color_literals(css_text)):
         if color not in color_dict:
             color_dict[color] = set()
         color_dict[color].add(context)
@@ -1,48 +1,61 @@
 import re
 import logging
 from bs4 import BeautifulSoup
+from .color_literals import scan_color_literals, declared_colors
+from app.Controllers.Scraper.style_sources import get_style_sources
 
-def extract_form_field_colors_from_css(css):
-    logging.debug("Extracting form field colors from CSS")
-    form_field_color_pattern = re.compile(r'(input|textarea|select|button)\s*{\s*(.*?)}', re.IGNORECASE)
-    color_pattern = re.compile(r'(color|background-color|border-color)\s*:\s*(#[0-9a-fA-F]{3,6}|rgba?\([0-9,\s]+\)|hsla?\([0-9,\s%]+\))', re.IGNORECASE)
+# A selector targets a form field when one of its comma-separated parts ends with the element name
+FORM_FIELD_PATTERN = re.compile(r'(?<![\w.#-])(input|textarea|select|button)\s*$', re.IGNORECASE)
 
-    form_fields = form_field_color_pattern.findall(css)
-    color_dict = {}
+def form_fields_in_selector(selector):
+    fields = []
+    for part in selector.split(','):
+        match = FORM_FIELD_PATTERN.search(part)
+        if match:
+            fields.append(match.group(1).lower())
+    return fields
 
-    for field, styles in form_fields:
-        colors = color_pattern.findall(styles)
-        for context, color in colors:
+def extract_form_field_colors_from_literals(literals):
+    color_dict = {}
+    selector_fields = {}
+    for literal in literals:
+        if not literal.leading:
+            continue
+        if literal.selector not in selector_fields:
+            selector_fields[literal.selector] = form_fields_in_selector(literal.selector)
+        fields = selector_fields[literal.selector]
+        if not fields:
+            continue
+        for context, color in declared_colors((literal,)):
             if color not in color_dict:
                 color_dict[color] = set()
-            color_dict[color].add(f'{field}-{context}')
+            color_dict[color].update(f'{field}-{context}' for field in fields)
 
     return color_dict
 
-def extract_form_field_colors_from_inline_styles(soup):
+def extract_form_field_colors_from_css(css):
+    logging.debug("Extracting form field colors from CSS")
+    return extract_form_field_colors_from_literals(scan_color_literals(css))
+
+def extract_form_field_colors_from_inline_styles(sources):
     logging.debug("Extracting form field colors from inline styles")
     form_field_tags = ['input', 'textarea', 'select', 'button']
     color_dict = {}
 
-    for tag in form_field_tags:
-        for element in soup.find_all(tag):
-            style = element.get('style')
-            if style:
-                colors = extract_form_field_colors_from_css(style)
-                for color, contexts in colors.items():
-                    if color not in color_dict:
-                        color_dict[color] = set()
-                    color_dict[color].update(contexts)
+    for inline_style in get_style_sources(sources).inline_styles_for(form_field_tags):
+        # The element itself is the form field, so its declarations need no selector match
+        for context, color in declared_colors(scan_color_literals(inline_style.style)):
+            if color not in color_dict:
+                color_dict[color] = set()
+            color_dict[color].add(f'{inline_style.tag}-{context}')
 
     return color_dict
 
-def extract_form_field_colors_from_styles(soup):
+def extract_form_field_colors_from_styles(sources):
     logging.debug("Extracting form field colors from <style> tags")
-    form_field_tags = ['input', 'textarea', 'select', 'button']
     color_dict = {}
 
-    for style in soup.find_all('style'):
-        css = style.text
+    for css in get_style_sources(sources).style_blocks:
         colors = extract_form_field_colors_from_css(css)
         for color, contexts in colors.items():
             if color not in color_dict:
@@ -1,28 +1,36 @@
 import re
 import logging
+from .color_literals import scan_color_literals
+from app.Controllers.Scraper.css_parser import iter_function_calls
+from app.Controllers.Scraper.style_sources import get_style_sources
+
+# Arguments of a linear-gradient( call up to its first ')'
+GRADIENT_PATTERN = re.compile(r'linear-gradient\s*\(', re.IGNORECASE)
+
+def extract_gradient_colors_from_literals(literals):
+    # A gradient declaration yields one record per color stop; read each value once
+    values = {literal.value for literal in literals if 'gradient' in literal.value}
+    gradients = set()
+    for value in values:
+        gradients.update(arguments for _, arguments in iter_function_calls(value, GRADIENT_PATTERN))
+    return gradients
 
 def extract_gradient_colors_from_css(css):
     logging.debug("Extracting gradient colors from CSS")
-    gradient_pattern = re.compile(r'linear-gradient\s*\(([^)]+)\)', re.IGNORECASE)
-    gradients = gradient_pattern.findall(css)
-    
-    return set(gradients)
+    return extract_gradient_colors_from_literals(scan_color_literals(css))
 
-def extract_gradient_colors_from_inline_styles(soup):
+def extract_gradient_colors_from_inline_styles(sources):
     logging.debug("Extracting gradient colors from inline styles")
     gradient_colors = set()
-    for element in soup.find_all(style=True):
-        style = element.get('style')
-        if style:
-            gradients = extract_gradient_colors_from_css(style)
-            gradient_colors.update(gradients)
+    for style in get_style_sources(sources).style_counts:
+        gradients = extract_gradient_colors_from_css(style)
+        gradient_colors.update(gradients)
     return gradient_colors
 
-def extract_gradient_colors_from_styles(soup):
+def extract_gradient_colors_from_styles(sources):
     logging.debug("Extracting gradient colors from <style> tags")
     gradient_colors = set()
-    for style in soup.find_all('style'):
-        css = style.text
+    for css in get_style_sources(sources).style_blocks:
         gradients = extract_gradient_colors_from_css(css)
         gradient_colors.update(gradients)
     return gradient_colors
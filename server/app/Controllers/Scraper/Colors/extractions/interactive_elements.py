@@ -1,42 +1,51 @@
 import re
 import logging
 from bs4 import BeautifulSoup
-import requests 
+import requests
+from app.Controllers.Scraper.http_client import http_get
+from .color_literals import scan_color_literals, declared_colors
+from app.Controllers.Scraper.style_sources import get_style_sources
 
-def extract_interactive_element_colors_from_css(css):
-    logging.debug("Extracting interactive element colors from CSS")
-    interactive_elements_pattern = re.compile(r'(button|a|input|select|textarea)\s*{[^}]*}', re.IGNORECASE)
-    elements = interactive_elements_pattern.findall(css)
-    
-    color_pattern = re.compile(r'(color|background-color|border-color)\s*:\s*(#[0-9a-fA-F]{3,6}|rgba?\([0-9,\s]+\)|hsla?\([0-9,\s%]+\))', re.IGNORECASE)
-    
+INTERACTIVE_TAGS = ('button', 'a', 'input', 'select', 'textarea')
+# A selector targets an interactive element when one of its comma-separated parts ends with the element name
+INTERACTIVE_ELEMENT_PATTERN = re.compile(r'(?<![\w.#-])(button|a|input|select|textarea)\s*$', re.IGNORECASE)
+
+def is_interactive_selector(selector):
+    return any(INTERACTIVE_ELEMENT_PATTERN.search(part) for part in selector.split(','))
+
+def extract_interactive_element_colors_from_literals(literals):
+    selectors = {}
     colors = set()
-    for element in elements:
-        colors.update(color_pattern.findall(element))
-    
+    for literal in literals:
+        if literal.selector not in selectors:
+            selectors[literal.selector] = is_interactive_selector(literal.selector)
+        if selectors[literal.selector]:
+            colors.update(declared_colors((literal,)))
     return colors
 
-def extract_interactive_element_colors_from_inline_styles(soup):
+def extract_interactive_element_colors_from_css(css):
+    logging.debug("Extracting interactive element colors from CSS")
+    return extract_interactive_element_colors_from_literals(scan_color_literals(css))
+
+def extract_interactive_element_colors_from_inline_styles(sources):
     logging.debug("Extracting interactive element colors from inline styles")
     colors = set()
-    for element in soup.find_all(['button', 'a', 'input', 'select', 'textarea'], style=True):
-        style = element.get('style')
-        if style:
-            colors.update(extract_interactive_element_colors_from_css(style))
+    for inline_style in get_style_sources(sources).inline_styles_for(INTERACTIVE_TAGS):
+        # The element itself is interactive, so its declarations need no selector match
+        colors.update(declared_colors(scan_color_literals(inline_style.style)))
     return colors
 
-def extract_interactive_element_colors_from_styles(soup):
+def extract_interactive_element_colors_from_styles(sources):
     logging.debug("Extracting interactive element colors from <style> tags")
     colors = set()
-    for style in soup.find_all('style'):
-        css = style.text
+    for css in get_style_sources(sources).style_blocks:
         colors.update(extract_interactive_element_colors_from_css(css))
     return colors
 
 def fetch_interactive_element_colors_from_external_css(css_url, headers):
     logging.debug(f"Fetching external CSS for interactive elements: {css_url}")
     try:
-        response = requests.get(css_url, headers=headers)
+        response = http_get(css_url, headers=headers)
         response.raise_for_status()
         css_text = response.text
         return extract_interactive_element_colors_from_css(css_text)
@@ -1,41 +1,44 @@
 import re
 import logging
 import requests
+from app.Controllers.Scraper.http_client import http_get
+from .color_literals import scan_color_literals, declared_colors
+from app.Controllers.Scraper.style_sources import get_style_sources
 
-def extract_mouse_state_colors_from_css(css):
-    logging.debug("Extracting mouse state colors from CSS")
-    mouse_state_pattern = re.compile(r'(:hover|:active|:focus)\s*{[^}]*}', re.IGNORECASE)
-    elements = mouse_state_pattern.findall(css)
-    
-    color_pattern = re.compile(r'(color|background-color|border-color)\s*:\s*(#[0-9a-fA-F]{3,6}|rgba?\([0-9,\s]+\)|hsla?\([0-9,\s%]+\))', re.IGNORECASE)
-    
+MOUSE_STATE_PATTERN = re.compile(r':(hover|active|focus)\b', re.IGNORECASE)
+
+def extract_mouse_state_colors_from_literals(literals):
+    selectors = {}
     colors = set()
-    for element in elements:
-        colors.update(color_pattern.findall(element))
-    
+    for literal in literals:
+        if literal.selector not in selectors:
+            selectors[literal.selector] = MOUSE_STATE_PATTERN.search(literal.selector) is not None
+        if selectors[literal.selector]:
+            colors.update(declared_colors((literal,)))
     return colors
 
-def extract_mouse_state_colors_from_inline_styles(soup):
+def extract_mouse_state_colors_from_css(css):
+    logging.debug("Extracting mouse state colors from CSS")
+    return extract_mouse_state_colors_from_literals(scan_color_literals(css))
+
+def extract_mouse_state_colors_from_inline_styles(sources):
     logging.debug("Extracting mouse state colors from inline styles")
     colors = set()
-    for element in soup.find_all(['button', 'a', 'input', 'select', 'textarea'], style=True):
-        style = element.get('style')
-        if style:
-            colors.update(extract_mouse_state_colors_from_css(style))
+    for inline_style in get_style_sources(sources).inline_styles_for(('button', 'a', 'input', 'select', 'textarea')):
+        colors.update(extract_mouse_state_colors_from_css(inline_style.style))
     return colors
 
-def extract_mouse_state_colors_from_styles(soup):
+def extract_mouse_state_colors_from_styles(sources):
     logging.debug("Extracting mouse state colors from <style> tags")
     colors = set()
-    for style in soup.find_all('style'):
-        css = style.text
+    for css in get_style_sources(sources).style_blocks:
         colors.update(extract_mouse_state_colors_from_css(css))
     return colors
 
 def fetch_mouse_state_colors_from_external_css(css_url, headers):
     logging.debug(f"Fetching external CSS for mouse states: {css_url}")
     try:
-        response = requests.get(css_url, headers=headers)
+        response = http_get(css_url, headers=headers)
         response.raise_for_status()
         css_text = response.text
         return extract_mouse_state_colors_from_css(css_text)
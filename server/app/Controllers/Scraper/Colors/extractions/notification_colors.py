@@ -1,42 +1,48 @@
 import re
 import logging
 import requests
+from app.Controllers.Scraper.http_client import http_get
 from bs4 import BeautifulSoup
+from .color_literals import scan_color_literals, declared_colors
+from app.Controllers.Scraper.style_sources import get_style_sources
 
-def extract_notification_colors_from_css(css):
-    logging.debug("Extracting notification colors from CSS")
-    notification_pattern = re.compile(r'(\.alert|\.notification|\.toast)[^}]*{[^}]*}', re.IGNORECASE)
-    elements = notification_pattern.findall(css)
-    
-    color_pattern = re.compile(r'(color|background-color|border-color)\s*:\s*(#[0-9a-fA-F]{3,6}|rgba?\([0-9,\s]+\)|hsla?\([0-9,\s%]+\))', re.IGNORECASE)
-    
+NOTIFICATION_PATTERN = re.compile(r'\.(alert|notification|toast)', re.IGNORECASE)
+NOTIFICATION_CLASS_PATTERN = re.compile(r'(alert|notification|toast)', re.IGNORECASE)
+
+def extract_notification_colors_from_literals(literals):
+    selectors = {}
     colors = set()
-    for element in elements:
-        colors.update(color_pattern.findall(element))
-    
+    for literal in literals:
+        if literal.selector not in selectors:
+            selectors[literal.selector] = NOTIFICATION_PATTERN.search(literal.selector) is not None
+        if selectors[literal.selector]:
+            colors.update(declared_colors((literal,)))
     return colors
 
-def extract_notification_colors_from_inline_styles(soup):
+def extract_notification_colors_from_css(css):
+    logging.debug("Extracting notification colors from CSS")
+    return extract_notification_colors_from_literals(scan_color_literals(css))
+
+def extract_notification_colors_from_inline_styles(sources):
     logging.debug("Extracting notification colors from inline styles")
     colors = set()
-    for element in soup.find_all(['div', 'span'], class_=re.compile(r'(alert|notification|toast)', re.IGNORECASE), style=True):
-        style = element.get('style')
-        if style:
-            colors.update(extract_notification_colors_from_css(style))
+    for inline_style in get_style_sources(sources).inline_styles_for(('div', 'span')):
+        if any(NOTIFICATION_CLASS_PATTERN.search(css_class) for css_class in inline_style.classes):
+            # The element's class already marks it as a notification
+            colors.update(declared_colors(scan_color_literals(inline_style.style)))
     return colors
 
-def extract_notification_colors_from_styles(soup):
+def extract_notification_colors_from_styles(sources):
     logging.debug("Extracting notification colors from <style> tags")
     colors = set()
-    for style in soup.find_all('style'):
-        css = style.text
+    for css in get_style_sources(sources).style_blocks:
         colors.update(extract_notification_colors_from_css(css))
     return colors
 
 def fetch_notification_colors_from_external_css(css_url, headers):
     logging.debug(f"Fetching external CSS for notifications: {css_url}")
     try:
-        response = requests.get(css_url, headers=headers)
+        response = http_get(css_url, headers=headers)
         response.raise_for_status()
         css_text = response.text
         return extract_notification_colors_from_css(css_text)
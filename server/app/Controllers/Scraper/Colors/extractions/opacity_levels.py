@@ -1,31 +1,32 @@
 import re
 from bs4 import BeautifulSoup
+from app.Controllers.Scraper.css_parser import iter_function_calls
+from app.Controllers.Scraper.style_sources import get_style_sources
 
-def extract_opacity_levels(soup):
+OPACITY_PATTERN = re.compile(r'opacity:\s*([^;]+)', re.IGNORECASE)
+# Translucent color functions, matched up to their first ')' in linear time
+TRANSLUCENT_COLOR_PATTERNS = (re.compile(r'rgba\(', re.IGNORECASE), re.compile(r'hsla\(', re.IGNORECASE))
+
+def find_opacity_levels(css_text):
+    levels = set(OPACITY_PATTERN.findall(css_text))
+    for pattern in TRANSLUCENT_COLOR_PATTERNS:
+        levels.update(call for call, _ in iter_function_calls(css_text, pattern))
+    return levels
+
+def extract_opacity_levels(sources):
     """
     Extracts opacity levels from both inline styles and <style> tags in the HTML content.
     """
     opacity_levels = set()
 
+    sources = get_style_sources(sources)
+
     # Extracting from inline styles
-    for tag in soup.find_all(style=True):
-        style_content = tag['style']
-        opacity_matches = re.findall(r'opacity:\s*([^;]+)', style_content, re.IGNORECASE)
-        rgba_matches = re.findall(r'rgba\([^)]+\)', style_content, re.IGNORECASE)
-        hsla_matches = re.findall(r'hsla\([^)]+\)', style_content, re.IGNORECASE)
-        opacity_levels.update(opacity_matches)
-        opacity_levels.update(rgba_matches)
-        opacity_levels.update(hsla_matches)
+    for style_content in sources.style_counts:
+        opacity_levels.update(find_opacity_levels(style_content))
 
     # Extracting from <style> tags
-    style_tags = soup.find_all('style')
-    for style in style_tags:
-        css_text = style.get_text()
-        opacity_matches = re.findall(r'opacity:\s*([^;]+)', css_text, re.IGNORECASE)
-        rgba_matches = re.findall(r'rgba\([^)]+\)', css_text, re.IGNORECASE)
-        hsla_matches = re.findall(r'hsla\([^)]+\)', css_text, re.IGNORECASE)
-        opacity_levels.update(opacity_matches)
-        opacity_levels.update(rgba_matches)
-        opacity_levels.update(hsla_matches)
+    for css_text in sources.style_blocks:
+        opacity_levels.update(find_opacity_levels(css_text))
 
     return opacity_levels
@@ -1,29 +1,28 @@
-import re
 import logging
 import requests
+from app.Controllers.Scraper.http_client import http_get
+from .color_literals import scan_color_literals, declared_colors
+from app.Controllers.Scraper.style_sources import get_style_sources
+
+def extract_primary_colors_from_literals(literals):
+    return set(color for context, color in declared_colors(literals))
 
 def extract_primary_colors_from_css(css):
     logging.debug("Extracting primary colors from CSS")
-    primary_color_pattern = re.compile(r'(color|background-color|border-color)\s*:\s*(#[0-9a-fA-F]{3,6}|rgba?\([0-9,\s]+\)|hsla?\([0-9,\s%]+\))', re.IGNORECASE)
-    colors = primary_color_pattern.findall(css)
-    
-    return set(color[1] for color in colors)
+    return extract_primary_colors_from_literals(scan_color_literals(css))
 
-def extract_primary_colors_from_inline_styles(soup):
+def extract_primary_colors_from_inline_styles(sources):
     logging.debug("Extracting primary colors from inline styles")
     primary_colors = set()
-    for element in soup.find_all(style=True):
-        style = element.get('style')
-        if style:
-            colors = extract_primary_colors_from_css(style)
-            primary_colors.update(colors)
+    for style in get_style_sources(sources).style_counts:
+        colors = extract_primary_colors_from_css(style)
+        primary_colors.update(colors)
     return primary_colors
 
-def extract_primary_colors_from_styles(soup):
+def extract_primary_colors_from_styles(sources):
     logging.debug("Extracting primary colors from <style> tags")
     primary_colors = set()
-    for style in soup.find_all('style'):
-        css = style.text
+    for css in get_style_sources(sources).style_blocks:
         colors = extract_primary_colors_from_css(css)
         primary_colors.update(colors)
     return primary_colors
@@ -31,7 +30,7 @@ def extract_primary_colors_from_styles(soup):
 def fetch_primary_colors_from_external_css(css_url, headers):
     logging.debug(f"Fetching external CSS for primary colors: {css_url}")
     try:
-        response = requests.get(css_url, headers=headers)
+        response = http_get(css_url, headers=headers)
         response.raise_for_status()
         css_text = response.text
         return extract_primary_colors_from_css(css_text)
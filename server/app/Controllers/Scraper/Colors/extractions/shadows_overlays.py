@@ -1,7 +1,9 @@
 import re
 from bs4 import BeautifulSoup
+from app.Controllers.Scraper.css_parser import iter_function_calls
+from app.Controllers.Scraper.style_sources import get_style_sources
 
-def extract_shadows_and_overlays(soup):
+def extract_shadows_and_overlays(sources):
     """
     Extracts shadow properties and overlay styles from both inline styles and <style> tags.
     """
@@ -10,22 +12,22 @@ def extract_shadows_and_overlays(soup):
 
     # Helper regex
     shadow_regex = re.compile(r'(?:box-shadow|text-shadow):\s*([^;]+)', re.IGNORECASE)
-    overlay_regex = re.compile(r'background:\s*rgba\([^)]+\)', re.IGNORECASE)
+    # Matched up to the first ')' through iter_function_calls, which stays linear on unclosed calls
+    overlay_regex = re.compile(r'background:\s*rgba\(', re.IGNORECASE)
+
+    sources = get_style_sources(sources)
 
     # Extract from inline styles
-    for tag in soup.find_all(style=True):
-        style_content = tag['style']
+    for style_content in sources.style_counts:
         shadow_matches = shadow_regex.findall(style_content)
-        overlay_matches = overlay_regex.findall(style_content)
+        overlay_matches = [call for call, _ in iter_function_calls(style_content, overlay_regex)]
         shadow_details.update(shadow_matches)
         overlay_details.update(overlay_matches)
 
     # Extract from <style> tags
-    style_tags = soup.find_all('style')
-    for style in style_tags:
-        css_text = style.get_text()
+    for css_text in sources.style_blocks:
         shadow_matches = shadow_regex.findall(css_text)
-        overlay_matches = overlay_regex.findall(css_text)
+        overlay_matches = [call for call, _ in iter_function_calls(css_text, overlay_regex)]
         shadow_details.update(shadow_matches)
         overlay_details.update(overlay_matches)
 
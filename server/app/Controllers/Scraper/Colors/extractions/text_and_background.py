@@ -1,41 +1,42 @@
-import re
 import logging
 from bs4 import BeautifulSoup
 import requests
+from app.Controllers.Scraper.http_client import http_get
 from urllib.parse import urljoin
+from .color_literals import scan_color_literals, declared_colors
+from app.Controllers.Scraper.style_sources import get_style_sources
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
+def extract_text_and_background_colors_from_literals(literals):
+    """Select (context, color) pairs for text and background colors from scanned color literals."""
+    colors = set()
+    for context, color in declared_colors(literals):
+        colors.add(('background-color' if context == 'background-color' else 'color', color))
+    return colors
+
 def extract_text_and_background_colors_from_css(css):
     """Extract text and background colors from CSS text."""
     logging.debug("Extracting text and background colors from CSS")
-    
-    # Regex pattern to find colors for text and background
-    color_pattern = re.compile(r'(color|background-color)\s*:\s*(#[0-9a-fA-F]{3,6}|rgba?\([0-9,\s]+\)|hsla?\([0-9,\s%]+\))', re.IGNORECASE)
-    
-    colors = set(color_pattern.findall(css))
-    return colors
+    return extract_text_and_background_colors_from_literals(scan_color_literals(css))
 
-def extract_text_and_background_colors_from_inline_styles(soup):
+def extract_text_and_background_colors_from_inline_styles(sources):
     """Extract text and background colors from inline styles."""
     logging.debug("Extracting text and background colors from inline styles")
     colors = set()
     
-    for element in soup.find_all(style=True):
-        style = element.get('style')
-        if style:
-            colors.update(extract_text_and_background_colors_from_css(style))
+    for style in get_style_sources(sources).style_counts:
+        colors.update(extract_text_and_background_colors_from_css(style))
     
     return colors
 
-def extract_text_and_background_colors_from_styles(soup):
+def extract_text_and_background_colors_from_styles(sources):
     """Extract text and background colors from <style> tags."""
     logging.debug("Extracting text and background colors from <style> tags")
     colors = set()
     
-    for style in soup.find_all('style'):
-        css = style.text
+    for css in get_style_sources(sources).style_blocks:
         colors.update(extract_text_and_background_colors_from_css(css))
     
     return colors
@@ -45,7 +46,7 @@ def fetch_text_and_background_colors_from_external_css(css_url, headers):
     logging.debug(f"Fetching external CSS for text and background colors: {css_url}")
     
     try:
-        response = requests.get(css_url, headers=headers)
+        response = http_get(css_url, headers=headers)
         response.raise_for_status()
         css_text = response.text
         return extract_text_and_background_colors_from_css(css_text)
@@ -1,11 +1,13 @@
 import logging
 import re
+from collections import Counter
 from .processes.contrast_ratio import average_contrast_score
-from .processes.color_conversion import convert_and_normalize_colors
+from .processes.color_histogram import ColorHistogram
 from .processes.harmony_analysis import evaluate_harmony
 from .processes.color_consistency import evaluate_consistency
 from .processes.color_mood import ColorTraitAnalyzer
 from .processes.palette_creation import ColorPaletteGenerator
+from app.Controllers.Scraper.deadline import Deadline, DeadlineExceeded
 
 def is_valid_hex(color):
     return re.match(r'^#([0-9a-fA-F]{6}|[0-9a-fA-F]{3})$', color) is not None
@@ -38,79 +40,107 @@ def normalize_hex_code(hex_code):
     return f'#{hex_code}'
 
 
-def gather_all_color_values(scraped_colors):
-    all_colors = []
+def normalize_color_entry(color):
+    if isinstance(color, tuple):  # (context, color) pairs from selector-scoped extractors
+        color = color[-1]
+    return normalize_hex_code(color) if '#' in color or len(color) == 3 or len(color) == 6 else color
+
+def iter_color_values(scraped_colors):
+    """Yield (color, usage) for every color value in the scraped categories.
+
+    Set members count once per category. Counters and other {color: number} mappings, such as
+    color_patterns and color_weights, contribute their counts. Dictionaries of sets, such as
+    feedback_colors, count once per sub-category.
+    """
     for color_category in scraped_colors.values():
         if isinstance(color_category, set):
             for color in color_category:
-                normalized_color = normalize_hex_code(color) if '#' in color or len(color) == 3 or len(color) == 6 else color
-                all_colors.append(normalized_color)
-        elif isinstance(color_category, dict):  # Assuming some categories might be dictionaries
-            for sub_category in color_category.values():
-                if isinstance(sub_category, set):
-                    for color in sub_category:
-                        normalized_color = normalize_hex_code(color) if '#' in color or len(color) == 3 or len(color) == 6 else color
-                        all_colors.append(normalized_color)
-    return all_colors
+                yield normalize_color_entry(color), 1
+        elif isinstance(color_category, dict):
+            for key, value in color_category.items():
+                if isinstance(value, (int, float)):
+                    yield normalize_color_entry(key), value
+                elif isinstance(value, set):
+                    for color in value:
+                        yield normalize_color_entry(color), 1
+
+def gather_all_color_values(scraped_colors):
+    return [color for color, _ in iter_color_values(scraped_colors)]
+
+def gather_color_weights(scraped_colors):
+    """Return a Counter of {color value: total usage} over every scraped category."""
+    color_weights = Counter()
+    for color, usage in iter_color_values(scraped_colors):
+        color_weights[color] += usage
+    return color_weights
 
 
 def log_results(results):
     if results:
         logging.info("\nColor Analysis Results:")
-        logging.info(f"Contrast Score: {results['contrast']:.2f} (Scale 1-10)")
-        logging.info(f"Harmony Score: {results['harmony']:.2f} (Scale 1-10)")
-        logging.info(f"Consistency Score: {results['consistency']:.2f} (Scale 1-10)")
-        logging.info(f"Best Trait: {results['best_trait']}")  # Log only the best trait
+        if 'contrast' in results:
+            logging.info(f"Contrast Score: {results['contrast']:.2f} (Scale 1-10)")
+        if 'harmony' in results:
+            logging.info(f"Harmony Score: {results['harmony']:.2f} (Scale 1-10)")
+        if 'consistency' in results:
+            logging.info(f"Consistency Score: {results['consistency']:.2f} (Scale 1-10)")
+        if 'best_trait' in results:
+            logging.info(f"Best Trait: {results['best_trait']}")  # Log only the best trait
         logging.info("\nNormalized Colors (RGB):")
-        for color in results['normalized_colors']:
+        for color in results.get('normalized_colors', []):
             logging.info(f"RGB: {color}")
         logging.info("\nGenerated Color Palette:")
-        for color in results['color_palette']:
+        for color in results.get('color_palette', []):
             logging.info(f"RGB: {color}")
     else:
         logging.info("No results to log.")
 
-def process_colors(scraped_colors):
+def process_colors(scraped_colors, deadline=None):
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     logging.info("Starting color processing...")
+    deadline = deadline or Deadline(None)
 
     try:
-        all_color_values = gather_all_color_values(scraped_colors)
-        if not all_color_values:
+        color_weights = gather_color_weights(scraped_colors)
+        if not color_weights:
             logging.warning("No colors found in scraped data.")
             return None  # Return None explicitly to indicate no data to process
 
-        valid_colors = validate_colors(all_color_values)
+        valid_colors = validate_colors(color_weights)
         if not valid_colors:
             logging.warning("No valid colors found after validation. Exiting process.")
             return None
 
-        normalized_colors = convert_and_normalize_colors(valid_colors)
-        if not normalized_colors:
+        # Every stage reads the unique colors and their usage instead of repeated values
+        histogram = ColorHistogram.from_color_values({color: color_weights[color] for color in valid_colors})
+        if not len(histogram):
             logging.error("Failed to normalize colors. Check color formats.")
             return None
-  
-
-        contrast_results = average_contrast_score(normalized_colors)
-        harmony_results = evaluate_harmony(normalized_colors)
-        consistency_results = evaluate_consistency(normalized_colors)
-
-        # Get only the best trait instead of all traits
-        best_trait = ColorTraitAnalyzer(valid_colors).classify_colors()
-
-        color_palette = ColorPaletteGenerator(normalized_colors).generate_palette()
-        if not color_palette:
-            logging.error("Failed to generate color palette.")
-            return None
-
-        results = {
-            'contrast': contrast_results,
-            'harmony': harmony_results,
-            'consistency': consistency_results,
-            'best_trait': best_trait,  # Store only the best trait
-            'normalized_colors': normalized_colors,
-            'color_palette': color_palette
-        }
+        normalized_colors = histogram.colors()
+        usage = histogram.counts
+
+        # Stages fill in results one at a time so a spent deadline still returns what is ready
+        results = {'normalized_colors': normalized_colors}
+        try:
+            deadline.check('contrast analysis')
+            results['contrast'] = average_contrast_score(normalized_colors, usage)
+            deadline.check('harmony analysis')
+            results['harmony'] = evaluate_harmony(normalized_colors, usage)
+            deadline.check('consistency analysis')
+            results['consistency'] = evaluate_consistency(normalized_colors, usage)
+
+            # Get only the best trait instead of all traits
+            deadline.check('trait analysis')
+            results['best_trait'] = ColorTraitAnalyzer(normalized_colors, weights=usage).classify_colors()
+
+            deadline.check('palette generation')
+            color_palette = ColorPaletteGenerator(histogram).generate_palette()
+            if not color_palette:
+                logging.error("Failed to generate color palette.")
+                return None
+            results['color_palette'] = color_palette
+        except DeadlineExceeded as e:
+            logging.warning(f"Returning partial color results: {e}")
 
         log_results(results)
         return results
@@ -119,5 +149,3 @@ def process_colors(scraped_colors):
         logging.error(f"Error processing colors: {e}")
         logging.warning("No results were retrieved or processed.")
         return None
-
-
@@ -3,14 +3,20 @@ from collections import Counter
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def evaluate_consistency(colors):
+def evaluate_consistency(colors, weights=None):
     """
     Scores the color consistency based on the dominance and frequency of color usage.
     
     :param colors: A list of colors used on the website.
+    :param weights: Optional usage counts parallel to colors, for a list of unique colors.
     :return: Consistency score from 1 to 10.
     """
-    color_count = Counter(colors)
+    if weights is None:
+        color_count = Counter(colors)
+    else:
+        color_count = Counter()
+        for color, weight in zip(colors, weights):
+            color_count[color] += float(weight)
     total_colors = sum(color_count.values())
     most_common_colors = color_count.most_common(3)
     dominant_percentage = sum(freq for _, freq in most_common_colors) / total_colors
@@ -68,27 +68,33 @@ if is_valid_color_value(hex_input):
 else:
     print("Invalid Hex Code")
 
+def normalize_color_value(color):
+    """Convert one color value to a normalized RGB tuple, or None if it is invalid."""
+    if not is_valid_color_value(color):
+        logging.error(f"Skipping invalid color format: {color}")
+        return None
+
+    if color.startswith('#') and len(color) in [4, 7]:  # Proper hex codes
+        rgb_color = normalize_color_to_rgb(color)
+    elif re.match(r'^[0-9a-fA-F]{3,6}$', color):  # Hex codes without '#'
+        color = normalize_hex_code(color)
+        rgb_color = normalize_color_to_rgb(color)
+    else:
+        converted_color = convert_color_format_to_rgb(color)
+        rgb_color = normalize_color_to_rgb(converted_color)
+
+    if rgb_color and validate_rgb(rgb_color):
+        return rgb_color
+    logging.error(f"Failed to normalize or validate RGB values for color: {color}")
+    return None
+
 def convert_and_normalize_colors(color_list):
     """Processes a list of colors, converting them to a normalized RGB format and ignoring invalid colors."""
     normalized_colors = set()
     for color in color_list:
-        if not is_valid_color_value(color):
-            logging.error(f"Skipping invalid color format: {color}")
-            continue
-
-        if color.startswith('#') and len(color) in [4, 7]:  # Proper hex codes
-            rgb_color = normalize_color_to_rgb(color)
-        elif re.match(r'^[0-9a-fA-F]{3,6}$', color):  # Hex codes without '#'
-            color = normalize_hex_code(color)
-            rgb_color = normalize_color_to_rgb(color)
-        else:
-            converted_color = convert_color_format_to_rgb(color)
-            rgb_color = normalize_color_to_rgb(converted_color)
-
-        if rgb_color and validate_rgb(rgb_color):
+        rgb_color = normalize_color_value(color)
+        if rgb_color:
             normalized_colors.add(rgb_color)
-        else:
-            logging.error(f"Failed to normalize or validate RGB values for color: {color}")
 
     return list(normalized_colors)
 
@@ -0,0 +1,59 @@
+import logging
+import numpy as np
+from .color_conversion import normalize_color_value
+
+# Set up logging configuration
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class ColorHistogram:
+    """
+    Unique colors packed as 0xRRGGBB uint32 values, with a parallel array of usage counts.
+
+    Counts are floats because usage mixes occurrence counts with cascade weights, where
+    interaction states count a fraction of an element. Colors are kept heaviest first, ties
+    broken by packed value, so every stage sees the same deterministic order and the analysis
+    stages do work proportional to the number of unique colors, not to how often each is used.
+    """
+
+    def __init__(self, packed, counts):
+        packed = np.asarray(packed, dtype=np.uint32).reshape(-1)
+        counts = np.asarray(counts, dtype=np.float64).reshape(-1)
+        order = np.lexsort((packed, -counts))
+        self.packed = packed[order]
+        self.counts = counts[order]
+
+    @classmethod
+    def from_rgb(cls, colors, weights=None):
+        """Build a histogram from (R, G, B) colors, summing the weights of repeated colors (1 each by default)."""
+        rgb = np.asarray(colors, dtype=np.uint32).reshape(-1, 3)
+        weights = np.ones(len(rgb)) if weights is None else np.asarray(weights, dtype=np.float64)
+        keys, inverse = np.unique((rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2], return_inverse=True)
+        return cls(keys, np.bincount(inverse.ravel(), weights=weights, minlength=len(keys)))
+
+    @classmethod
+    def from_color_values(cls, color_weights):
+        """Build a histogram from {CSS color value: usage}, converting each distinct value once."""
+        colors = []
+        weights = []
+        for color, weight in color_weights.items():
+            rgb_color = normalize_color_value(color)
+            if rgb_color:
+                colors.append(rgb_color)
+                weights.append(weight)
+        return cls.from_rgb(colors, weights)
+
+    def __len__(self):
+        return len(self.packed)
+
+    @property
+    def rgb(self):
+        """(n, 3) integer array of the unique colors."""
+        packed = self.packed.astype(np.int64)
+        return np.column_stack(((packed >> 16) & 0xff, (packed >> 8) & 0xff, packed & 0xff))
+
+    def colors(self):
+        """Unique colors as (R, G, B) tuples of Python ints, heaviest first."""
+        return [tuple(color) for color in self.rgb.tolist()]
+
+    def total(self):
+        return float(self.counts.sum())
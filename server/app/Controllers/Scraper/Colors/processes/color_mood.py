@@ -1,16 +1,50 @@
+import os
 import re
+import json
 import math
 import logging
+import functools
+import numpy as np
 
 # Set up logging configuration
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Trait definitions: name -> hue, saturation and luminance ranges; a null hue_range matches any hue
+TRAITS_PATH = os.getenv('SCRAPER_COLOR_TRAITS_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'color_traits.json'))
+
+@functools.lru_cache(maxsize=None)
+def load_traits(path=TRAITS_PATH):
+    """Load trait definitions from JSON, keeping the file's order, which breaks ties between equal scores."""
+    with open(path, encoding='utf-8') as f:
+        traits = json.load(f)
+    for trait, criteria in traits.items():
+        for key in ('saturation_range', 'luminance_range'):
+            if len(criteria[key]) != 2:
+                raise ValueError(f"Trait {trait}: {key} must be [low, high]")
+    return traits
+
+def trait_bounds(traits):
+    """Stack trait ranges into (traits, 3) low and high arrays over (hue, saturation, luminance)."""
+    lows = []
+    highs = []
+    for criteria in traits.values():
+        hue_range = criteria['hue_range'] or (-math.inf, math.inf)
+        lows.append((hue_range[0], criteria['saturation_range'][0], criteria['luminance_range'][0]))
+        highs.append((hue_range[1], criteria['saturation_range'][1], criteria['luminance_range'][1]))
+    return np.array(lows, dtype=np.float64), np.array(highs, dtype=np.float64)
+
 class ColorTraitAnalyzer:
-    def __init__(self, colors):
+    def __init__(self, colors, traits=None, weights=None):
+        if weights is not None:
+            weights = [weight for color, weight in zip(colors, weights) if color]
         self.colors = [self.convert_color(color) for color in colors if color]
+        self.weights = weights
+        self.traits = traits if traits is not None else load_traits()
 
     def convert_color(self, color):
         """Convert color to RGB tuple."""
+        if isinstance(color, tuple):  # Already normalized (R, G, B)
+            return color
         if color.startswith('rgba'):
             return self.rgba_to_rgb(color)
         elif color.startswith('rgb'):
@@ -69,25 +103,45 @@ class ColorTraitAnalyzer:
             h /= 6
         return h * 360, s, l
 
+    def hsl_array(self):
+        """Vectorized rgb_to_hsl over every valid color, as an (n, 3) array of hue, saturation, luminance."""
+        rgb = np.array([color for color in self.colors if color is not None], dtype=np.float64).reshape(-1, 3) / 255.0
+        r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+        max_c = np.maximum(np.maximum(r, g), b)
+        min_c = np.minimum(np.minimum(r, g), b)
+        l = (max_c + min_c) / 2
+        delta = max_c - min_c
+        gray = max_c == min_c
+        with np.errstate(divide='ignore', invalid='ignore'):
+            s = np.where(l > 0.5, delta / (2 - max_c - min_c), delta / (max_c + min_c))
+            h = np.select(
+                [max_c == r, max_c == g],
+                [(g - b) / delta + np.where(g < b, 6, 0), (b - r) / delta + 2],
+                (r - g) / delta + 4,
+            ) / 6
+        h = np.where(gray, 0.0, h)
+        s = np.where(gray, 0.0, s)
+        return np.column_stack((h * 360, s, l))
+
+    def trait_scores(self):
+        """Score every trait at once: the share of colors whose HSL falls inside all of the trait's ranges."""
+        hsl = self.hsl_array()
+        lows, highs = trait_bounds(self.traits)
+        # (traits, colors) boolean matrix of colors matching each trait
+        matches = ((hsl[None, :, :] >= lows[:, None, :]) & (hsl[None, :, :] <= highs[:, None, :])).all(axis=2)
+        if self.weights is not None:
+            # Share of total usage instead of share of colors
+            weights = np.array([weight for color, weight in zip(self.colors, self.weights) if color is not None], dtype=np.float64)
+            total = weights.sum()
+            return {trait: float(usage) / total if total else 0 for trait, usage in zip(self.traits, matches @ weights)}
+        counts = matches.sum(axis=1)
+        total = len(hsl)
+        return {trait: int(count) / total if total else 0 for trait, count in zip(self.traits, counts)}
+
     def classify_colors(self):
         """Classify colors based on predefined traits and return the trait with the highest score."""
-        traits = {
-            'Professional': {'hue_range': None, 'saturation_range': (0, 0.3), 'luminance_range': (0.2, 0.8)},
-            'Creative': {'hue_range': None, 'saturation_range': (0.4, 1), 'luminance_range': (0.1, 0.9)},
-            'Experimental': {'hue_range': None, 'saturation_range': (0.6, 1), 'luminance_range': (0, 1)},
-            'Calm': {'hue_range': (180, 300), 'saturation_range': (0, 0.3), 'luminance_range': (0.7, 1)},
-            'Playful': {'hue_range': (30, 90), 'saturation_range': (0.5, 1), 'luminance_range': (0.4, 0.8)},
-            'Elegant': {'hue_range': None, 'saturation_range': (0.2, 0.5), 'luminance_range': (0.6, 1)},
-            'Dynamic': {'hue_range': None, 'saturation_range': (0.6, 1), 'luminance_range': (0.3, 0.7)},
-            'Authentic': {'hue_range': None, 'saturation_range': (0.3, 0.6), 'luminance_range': (0.2, 0.7)},
-            'Inviting': {'hue_range': None, 'saturation_range': (0.2, 0.6), 'luminance_range': (0.5, 0.9)},
-            'Sophisticated': {'hue_range': None, 'saturation_range': (0.4, 0.8), 'luminance_range': (0.3, 0.7)}
-        }
-
-        results = {}
-        for trait, criteria in traits.items():
-            score = self.evaluate_trait(criteria)
-            results[trait] = score
+        results = self.trait_scores()
+        for trait, score in results.items():
             logging.debug(f"Trait: {trait}, Score: {score}")
 
         # Find the trait with the highest score
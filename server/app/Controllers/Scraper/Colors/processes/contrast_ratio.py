@@ -1,16 +1,24 @@
 import math
 import logging
+import numpy as np
 
 # Set up logging configuration
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Rows of the pairwise contrast matrix computed at once, bounding memory for very large palettes
+CONTRAST_BLOCK_ROWS = 512
+
+def relative_luminance(r, g, b):
+    """WCAG relative luminance of an RGB color, without a per-call debug log for bulk use."""
+    a = [v / 255.0 for v in (r, g, b)]
+    a = [(v / 12.92 if v <= 0.03928 else math.pow((v + 0.055) / 1.055, 2.4)) for v in a]
+    return 0.2126 * a[0] + 0.7152 * a[1] + 0.0722 * a[2]
+
 def luminance(r, g, b):
     """
     Calculate the luminance of a color using its RGB components.
     """
-    a = [v / 255.0 for v in (r, g, b)]
-    a = [(v / 12.92 if v <= 0.03928 else math.pow((v + 0.055) / 1.055, 2.4)) for v in a]
-    luminance_value = 0.2126 * a[0] + 0.7152 * a[1] + 0.0722 * a[2]
+    luminance_value = relative_luminance(r, g, b)
     logging.debug(f"Luminance for RGB {r, g, b}: {luminance_value}")
     return luminance_value
 
@@ -43,18 +51,51 @@ def scale_contrast_ratio_to_score(contrast_ratio):
     logging.debug(f"Score for contrast ratio {contrast_ratio}: {score}")
     return score
 
-def average_contrast_score(colors):
+def scale_contrast_ratios_to_scores(ratios):
+    """
+    Vectorized scale_contrast_ratio_to_score over an array of contrast ratios.
+    """
+    scores = np.select(
+        [ratios < 1, ratios < 3, ratios < 4.5, ratios < 7],
+        [1.0, 2 + (ratios - 1) / 2 * 3, 5 + (ratios - 3) / 1.5 * 2, 7 + (ratios - 4.5) / 2.5 * 2],
+        9 + (ratios - 7) / 14 * 1,
+    )
+    return np.minimum(scores, 10)
+
+def average_contrast_score(colors, weights=None):
+    """
+    Average score over every pair of colors, computed as array operations.
+
+    Each color's luminance is computed once. Pair scores are added in the same order as the
+    pairwise loop this replaces, through a sequential cumsum, so the result is identical to it.
+    With weights (usage counts of unique colors), each pair counts by the product of its weights.
+    """
     colors = list(colors)  # Convert set to list to allow indexing
-    total_score = 0
-    num_comparisons = 0
-    for i in range(len(colors)):
-        for j in range(i + 1, len(colors)):
-            color1, color2 = colors[i], colors[j]
-            ratio = contrast_ratio(color1, color2)
-            score = scale_contrast_ratio_to_score(ratio)
-            total_score += score
-            num_comparisons += 1
-    average_score = total_score / num_comparisons if num_comparisons > 0 else 0
+    count = len(colors)
+    lum = np.array([relative_luminance(*color) for color in colors], dtype=np.float64)
+    if weights is not None:
+        weights = np.asarray(weights, dtype=np.float64)
+    total_score = 0.0
+    total_weight = 0.0
+    num_comparisons = count * (count - 1) // 2
+    for start in range(0, max(count - 1, 0), CONTRAST_BLOCK_ROWS):
+        rows = lum[start:start + CONTRAST_BLOCK_ROWS, None]
+        lighter = np.maximum(rows, lum[None, :])
+        darker = np.minimum(rows, lum[None, :])
+        ratios = (lighter + 0.05) / (darker + 0.05)
+        # Pairs (i, j) with j > i, flattened row by row like the nested loop
+        upper = np.arange(count)[None, :] > np.arange(start, start + len(rows))[:, None]
+        scores = scale_contrast_ratios_to_scores(ratios[upper])
+        if weights is None:
+            total_score = float(np.cumsum(np.concatenate(([total_score], scores)))[-1])
+        else:
+            pair_weights = (weights[start:start + len(rows), None] * weights[None, :])[upper]
+            total_score += float(scores @ pair_weights)
+            total_weight += float(pair_weights.sum())
+    if weights is None:
+        average_score = total_score / num_comparisons if num_comparisons > 0 else 0
+    else:
+        average_score = total_score / total_weight if total_weight > 0 else 0
     rounded_score = round(average_score, 2)  # Round the average score to 2 decimal places
     logging.debug(f"Average contrast score (rounded): {rounded_score}")
     return rounded_score
@@ -1,6 +1,11 @@
-from colour import Color
+from colour import Color, FLOAT_ERROR
 import numpy as np
 
+HUE_BINS = 360
+# Integer bin distances whose pairs can fall on either side of a harmony_type boundary (30, 90 or 150
+# degrees); pairs at these distances are classified from their exact hues, every other distance by bin
+BOUNDARY_BIN_DISTANCES = (29, 30, 31, 89, 90, 91, 149, 150, 151)
+
 def color_wheel_position(color):
     """Convert a color to its position on the color wheel."""
     hue = Color(rgb=(color[0]/255, color[1]/255, color[2]/255)).hue
@@ -23,6 +28,99 @@ def harmony_type(distance):
     else:
         return 'Neutral'
 
+def color_wheel_positions(colors):
+    """Vectorized color_wheel_position: colour's rgb2hsl hue for every (R, G, B) color, in degrees."""
+    rgb = np.asarray(colors, dtype=np.float64).reshape(-1, 3) / 255
+    if rgb.size and ((rgb < -FLOAT_ERROR) | (rgb > 1 + FLOAT_ERROR)).any():
+        raise ValueError(f"RGB components must be between 0 and 255, got {colors}")
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    vmin = np.minimum(np.minimum(r, g), b)
+    vmax = np.maximum(np.maximum(r, g), b)
+    diff = vmax - vmin
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dr = (((vmax - r) / 6) + (diff / 2)) / diff
+        dg = (((vmax - g) / 6) + (diff / 2)) / diff
+        db = (((vmax - b) / 6) + (diff / 2)) / diff
+    hue = np.select([r == vmax, g == vmax], [db - dg, (1.0 / 3) + dr - db], (2.0 / 3) + dg - dr)
+    hue = np.where(hue < 0, hue + 1, hue)
+    hue = np.where(hue > 1, hue - 1, hue)
+    hue = np.where(diff < FLOAT_ERROR, 0.0, hue)  # Grays have no chroma
+    return hue * 360
+
+def harmony_types(distances):
+    """Vectorized harmony_type over an array of hue distances."""
+    return np.select(
+        [distances < 30,
+         (150 < distances) & (distances < 210),
+         ((distances > 30) & (distances < 90)) | ((270 < distances) & (distances < 330)),
+         ((distances > 90) & (distances < 150)) | ((210 < distances) & (distances < 270))],
+        ['Analogous', 'Complementary', 'Split-Complementary', 'Triadic'],
+        'Neutral',
+    )
+
+def harmony_counts_from_hues(hues, weights=None):
+    """Count the harmony type of every pair of hues from a hue histogram, in O(n) plus a 360-bin step.
+
+    Hues are floored into one-degree bins. The number of pairs at each circular bin distance is the
+    histogram's circular autocorrelation, computed by FFT. A pair's exact distance is within one
+    degree of its bin distance, so every bin distance except those next to a harmony_type boundary
+    maps to one harmony type; pairs at those few distances are classified from their exact hues.
+    With weights, each pair counts by the product of its two weights instead of 1.
+    """
+    harmony_counts = {'Analogous': 0, 'Complementary': 0, 'Triadic': 0, 'Split-Complementary': 0, 'Neutral': 0}
+    count = len(hues)
+    if count < 2:
+        return harmony_counts
+
+    bins = np.floor(hues).astype(np.int64) % HUE_BINS
+    members = np.bincount(bins, minlength=HUE_BINS)
+    if weights is None:
+        weights = np.ones(count, dtype=np.int64)
+        spectrum = np.fft.rfft(members)
+        correlation = np.rint(np.fft.irfft(spectrum * np.conj(spectrum), HUE_BINS)).astype(np.int64)
+        to_count = int
+    else:
+        weights = np.asarray(weights, dtype=np.float64)
+        spectrum = np.fft.rfft(np.bincount(bins, weights=weights, minlength=HUE_BINS))
+        correlation = np.fft.irfft(spectrum * np.conj(spectrum), HUE_BINS)
+        to_count = float
+
+    # Unordered pairs per circular bin distance 0..180
+    pairs = correlation[:HUE_BINS // 2 + 1].copy()
+    if to_count is int:
+        pairs[0] = (pairs[0] - count) // 2
+        pairs[HUE_BINS // 2] //= 2
+    else:
+        pairs[0] = (pairs[0] - weights @ weights) / 2
+        pairs[HUE_BINS // 2] /= 2
+        # Zero lag bounds every other lag, so anything this small is FFT rounding around an empty distance
+        pairs[np.abs(pairs) <= correlation[0] * 1e-9] = 0
+
+    for distance, pair_count in enumerate(pairs):
+        if pair_count and distance not in BOUNDARY_BIN_DISTANCES:
+            harmony_counts[harmony_type(distance)] += to_count(pair_count)
+
+    # Hues sorted by bin, so the members of bin k are sorted_hues[starts[k]:starts[k + 1]]
+    order = np.argsort(bins, kind='stable')
+    sorted_hues = hues[order]
+    sorted_weights = weights[order]
+    sorted_bins = bins[order]
+    starts = np.searchsorted(sorted_bins, np.arange(HUE_BINS + 1))
+    for distance in BOUNDARY_BIN_DISTANCES:
+        if not pairs[distance]:
+            continue
+        # Pair every hue with each member of the bin `distance` degrees ahead; each pair appears once
+        partner_bins = (sorted_bins + distance) % HUE_BINS
+        lengths = members[partner_bins]
+        firsts = np.repeat(np.arange(count), lengths)
+        seconds = np.repeat(starts[partner_bins], lengths) + np.arange(len(firsts)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        offsets = np.abs(sorted_hues[firsts] - sorted_hues[seconds])
+        types, inverse = np.unique(harmony_types(np.minimum(offsets, 360 - offsets)), return_inverse=True)
+        type_counts = np.bincount(inverse.ravel(), weights=sorted_weights[firsts] * sorted_weights[seconds], minlength=len(types))
+        for harmony, type_count in zip(types, type_counts):
+            harmony_counts[str(harmony)] += to_count(type_count)
+    return harmony_counts
+
 def calculate_harmony_scores(harmony_counts):
     """Calculate harmony scores from harmony type counts."""
     score = 0
@@ -40,16 +138,10 @@ def calculate_harmony_scores(harmony_counts):
             score += (count / total) * weights[harmony]
     return round(score, 2)
 
-def evaluate_harmony(colors):
-    """Evaluate the harmony of a set of colors based on their positions on the color wheel."""
-    hues = [color_wheel_position(color) for color in colors]
-    harmony_counts = {'Analogous': 0, 'Complementary': 0, 'Triadic': 0, 'Split-Complementary': 0, 'Neutral': 0}
-    for i, hue1 in enumerate(hues):
-        for j in range(i + 1, len(hues)):
-            distance = color_distance(hue1, hues[j])
-            harmony = harmony_type(distance)
-            harmony_counts[harmony] += 1
-    return calculate_harmony_scores(harmony_counts)
+def evaluate_harmony(colors, weights=None):
+    """Evaluate the harmony of a set of colors based on their positions on the color wheel, optionally weighted by usage."""
+    hues = color_wheel_positions(list(colors))
+    return calculate_harmony_scores(harmony_counts_from_hues(hues, weights))
 
 # Example usage
 colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
@@ -1,37 +1,150 @@
+import os
 import logging
-from sklearn.cluster import KMeans
 import numpy as np
+from .color_histogram import ColorHistogram
 
 # Set up logging configuration
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# 'median_cut' runs the built-in engine; 'kmeans' uses scikit-learn as a reference when it is installed
+PALETTE_BACKEND = os.getenv('SCRAPER_PALETTE_BACKEND', 'median_cut')
+# Weighted k-means refinement passes run after the median-cut split
+LLOYD_ITERATIONS = int(os.getenv('SCRAPER_PALETTE_LLOYD_ITERATIONS', '4'))
+
+# sRGB (D65) to CIE XYZ, and the D65 reference white
+RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+
+def rgb_to_lab(rgb):
+    """Convert an (n, 3) array of 0-255 sRGB colors to CIE Lab, where distances follow perceived difference."""
+    srgb = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(srgb > 0.04045, ((srgb + 0.055) / 1.055) ** 2.4, srgb / 12.92)
+    xyz = linear @ RGB_TO_XYZ.T / D65_WHITE
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    return np.column_stack((116 * f[:, 1] - 16, 500 * (f[:, 0] - f[:, 1]), 200 * (f[:, 1] - f[:, 2])))
+
+
+def _box_spread(points, weights):
+    """Weighted squared error of a box around its mean, and the axis it is widest along."""
+    mean = weights @ points / weights.sum()
+    spread = weights @ (points - mean) ** 2
+    return spread.sum(), int(spread.argmax())
+
+
+def weighted_median_cut(points, weights, num_boxes):
+    """Split points into at most num_boxes index arrays.
+
+    The box with the largest weighted squared error is cut at the weighted median of its widest
+    axis until there are num_boxes boxes or no box holds more than one distinct point.
+    """
+    boxes = [np.arange(len(points))]
+    spreads = [_box_spread(points, weights)]
+    while len(boxes) < num_boxes:
+        best = max(range(len(boxes)), key=lambda i: spreads[i][0] if len(boxes[i]) > 1 else -1.0)
+        error, axis = spreads[best]
+        if len(boxes[best]) < 2 or error <= 0:
+            break
+        box = boxes[best]
+        order = box[np.argsort(points[box, axis], kind='stable')]
+        cumulative = np.cumsum(weights[order])
+        cut = int(np.searchsorted(cumulative, cumulative[-1] / 2)) + 1
+        cut = min(max(cut, 1), len(order) - 1)
+        boxes[best], spreads[best] = order[:cut], _box_spread(points[order[:cut]], weights[order[:cut]])
+        boxes.append(order[cut:])
+        spreads.append(_box_spread(points[order[cut:]], weights[order[cut:]]))
+    return boxes
+
+
+def weighted_lloyd(points, weights, centers, iterations=LLOYD_ITERATIONS):
+    """Refine centers with weighted k-means passes and return the final label of every point."""
+    labels = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+    for _ in range(iterations):
+        totals = np.bincount(labels, weights=weights, minlength=len(centers))
+        for axis in range(points.shape[1]):
+            sums = np.bincount(labels, weights=weights * points[:, axis], minlength=len(centers))
+            np.divide(sums, totals, out=centers[:, axis], where=totals > 0)
+        new_labels = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+    return labels
+
+
+def median_cut_palette(colors, weights, num_clusters):
+    """Deterministic palette of weighted mean RGB colors, heaviest cluster first."""
+    lab = rgb_to_lab(colors)
+    boxes = weighted_median_cut(lab, weights, num_clusters)
+    centers = np.array([weights[box] @ lab[box] / weights[box].sum() for box in boxes])
+    labels = weighted_lloyd(lab, weights, centers)
+
+    totals = np.bincount(labels, weights=weights, minlength=len(boxes))
+    rgb_sums = np.column_stack([np.bincount(labels, weights=weights * colors[:, axis], minlength=len(boxes)) for axis in range(3)])
+    order = [cluster for cluster in np.argsort(-totals, kind='stable') if totals[cluster] > 0]
+    return (rgb_sums[order] / totals[order, None]).astype(int)
+
+
+def kmeans_palette(colors, weights, num_clusters):
+    """Reference palette from scikit-learn's KMeans over the same weighted histogram."""
+    from sklearn.cluster import KMeans
+    kmeans = KMeans(n_clusters=num_clusters, random_state=0).fit(colors, sample_weight=weights)
+    return kmeans.cluster_centers_.astype(int)
+
+
+PALETTE_BACKENDS = {
+    'median_cut': median_cut_palette,
+    'kmeans': kmeans_palette,
+}
+
+
 class ColorPaletteGenerator:
-    def __init__(self, colors, num_clusters=5):
-        if not colors:
+    def __init__(self, colors, num_clusters=5, weights=None, backend=None):
+        """colors is a list of RGB tuples with optional weights, or a ColorHistogram used as is."""
+        if not len(colors):
             logging.error("No colors provided for palette generation.")
             raise ValueError("Colors list cannot be empty.")
-        
-        logging.debug(f"Received colors: {colors}")
 
-        self.colors = np.array(colors)
-        if self.colors.ndim != 2 or self.colors.shape[1] != 3:
-            logging.error("Colors must be a list of RGB tuples.")
-            raise ValueError("Colors must be a list of RGB tuples.")
-        
-        self.num_clusters = min(num_clusters, len(colors))
-        logging.debug(f"Initialized with colors: {self.colors}")
+        logging.debug(f"Received {len(colors)} colors")
+
+        if isinstance(colors, ColorHistogram):
+            histogram = colors
+        else:
+            rgb = np.array(colors)
+            if rgb.ndim != 2 or rgb.shape[1] != 3:
+                logging.error("Colors must be a list of RGB tuples.")
+                raise ValueError("Colors must be a list of RGB tuples.")
+            if weights is not None and len(weights) != len(colors):
+                logging.error("Weights must match the colors one to one.")
+                raise ValueError("Weights must match the colors one to one.")
+            histogram = ColorHistogram.from_rgb(rgb, weights)
+
+        self.histogram = histogram
+        self.unique_colors = histogram.rgb
+        self.weights = histogram.counts
+        self.num_clusters = min(num_clusters, len(self.unique_colors))
+        self.backend = backend or PALETTE_BACKEND
+        if self.backend not in PALETTE_BACKENDS:
+            logging.warning(f"Unknown palette backend {self.backend}, using median_cut")
+            self.backend = 'median_cut'
+        logging.debug(f"Initialized with {len(self.unique_colors)} unique colors")
 
     def generate_palette(self):
         """
-        Generate a color palette using K-Means clustering and return it in HEX format.
+        Generate a color palette from the weighted color histogram and return it in HEX format.
         """
         try:
-            kmeans = KMeans(n_clusters=self.num_clusters, random_state=0).fit(self.colors)
-            palette_rgb = kmeans.cluster_centers_.astype(int)
+            try:
+                palette_rgb = PALETTE_BACKENDS[self.backend](self.unique_colors, self.weights, self.num_clusters)
+            except ImportError as e:
+                logging.warning(f"Palette backend {self.backend} unavailable ({e}), using median_cut")
+                palette_rgb = median_cut_palette(self.unique_colors, self.weights, self.num_clusters)
             palette_hex = [f"#{r:02x}{g:02x}{b:02x}" for r, g, b in palette_rgb]
             logging.debug(f"Generated color palette in HEX: {palette_hex}")
             return palette_hex
         except Exception as e:
             logging.error(f"Error generating color palette: {e}")
             return []
-
@@ -1,24 +1,27 @@
 import logging
-import requests
-from bs4 import BeautifulSoup
 from collections import Counter
-from urllib.parse import urljoin
+from app.Controllers.Scraper.extraction_cache import memoize_css
+from app.Controllers.Scraper.extraction_pool import offload_large, offload_deadline
+from app.Controllers.Scraper.deadline import DeadlineExceeded
+from app.Controllers.Scraper.page_context import stylesheet_rule_order
 
 # Import existing extraction functions
-from .extractions.accent import extract_accent_colors_from_css, extract_accent_colors_from_inline_styles, extract_accent_colors_from_styles
-from .extractions.background_colors import extract_background_colors_from_css, extract_background_colors_from_inline_styles, extract_background_colors_from_styles
-from .extractions.border_colors import extract_border_colors_from_css, extract_border_colors_from_inline_styles, extract_border_colors_from_styles
-from .extractions.color_patterns import extract_color_patterns_from_css, extract_color_patterns_from_inline_styles, extract_color_patterns_from_styles
-from .extractions.form_field_colors import extract_form_field_colors_from_css, extract_form_field_colors_from_inline_styles, extract_form_field_colors_from_styles
-from .extractions.gradient_colors import extract_gradient_colors_from_css, extract_gradient_colors_from_inline_styles, extract_gradient_colors_from_styles
-from .extractions.interactive_elements import extract_interactive_element_colors_from_css, extract_interactive_element_colors_from_inline_styles, extract_interactive_element_colors_from_styles
-from .extractions.mouse_state_colors import extract_mouse_state_colors_from_css, extract_mouse_state_colors_from_inline_styles, extract_mouse_state_colors_from_styles
-from .extractions.notification_colors import extract_notification_colors_from_css, extract_notification_colors_from_inline_styles, extract_notification_colors_from_styles
-from .extractions.primary import extract_primary_colors_from_css, extract_primary_colors_from_inline_styles, extract_primary_colors_from_styles, fetch_primary_colors_from_external_css
-from .extractions.secondary import extract_secondary_colors_from_css, extract_secondary_colors_from_inline_styles, extract_secondary_colors_from_styles, fetch_secondary_colors_from_external_css
-from .extractions.text_colors import extract_text_colors_from_css, extract_text_colors_from_inline_styles, extract_text_colors_from_styles
+from .extractions.accent import extract_accent_colors_from_literals, extract_accent_colors_from_inline_styles, extract_accent_colors_from_styles
+from .extractions.background_colors import extract_background_colors_from_literals, extract_background_colors_from_inline_styles, extract_background_colors_from_styles
+from .extractions.border_colors import extract_border_colors_from_literals, extract_border_colors_from_inline_styles, extract_border_colors_from_styles
+from .extractions.color_patterns import extract_color_patterns_from_literals, extract_color_patterns_from_inline_styles, extract_color_patterns_from_styles
+from .extractions.form_field_colors import extract_form_field_colors_from_literals, extract_form_field_colors_from_inline_styles, extract_form_field_colors_from_styles
+from .extractions.gradient_colors import extract_gradient_colors_from_literals, extract_gradient_colors_from_inline_styles, extract_gradient_colors_from_styles
+from .extractions.interactive_elements import extract_interactive_element_colors_from_literals, extract_interactive_element_colors_from_inline_styles, extract_interactive_element_colors_from_styles
+from .extractions.mouse_state_colors import extract_mouse_state_colors_from_literals, extract_mouse_state_colors_from_inline_styles, extract_mouse_state_colors_from_styles
+from .extractions.notification_colors import extract_notification_colors_from_literals, extract_notification_colors_from_inline_styles, extract_notification_colors_from_styles
+from .extractions.primary import extract_primary_colors_from_literals, extract_primary_colors_from_inline_styles, extract_primary_colors_from_styles
+from .extractions.secondary import extract_secondary_colors_from_literals, extract_secondary_colors_from_inline_styles, extract_secondary_colors_from_styles
+from .extractions.text_colors import extract_text_colors_from_literals, extract_text_colors_from_inline_styles, extract_text_colors_from_styles
 from .extractions.text_and_background import extract_text_and_background_colors_from_css as extract_background_colors_from_css_for_text, extract_text_and_background_colors_from_inline_styles as extract_background_colors_from_inline_styles_for_text, extract_text_and_background_colors_from_styles as extract_background_colors_from_styles_for_text
-from .extractions.button_colors import extract_button_colors_from_css, extract_button_colors_from_inline_styles, extract_button_colors_from_styles
+from .extractions.button_colors import extract_button_colors_from_literals, extract_button_colors_from_inline_styles, extract_button_colors_from_styles
+from .extractions.color_literals import scan_color_literals
+from .cascade_index import CascadeIndex
 from .extractions.error_colors import extract_feedback_colors
 from .extractions.shadows_overlays import extract_shadows_and_overlays
 from .extractions.opacity_levels import extract_opacity_levels
@@ -27,85 +30,77 @@ from .extractions.opacity_levels import extract_opacity_levels
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def fetch_external_css(css_url, headers):
-
-    try:
-        response = requests.get(css_url, headers=headers)
-        response.raise_for_status()
-        return response.text
-    except requests.RequestException as e:
- 
-        return ""
-
-def get_external_css_links(soup):
-    links = []
-    for link in soup.find_all('link', rel='stylesheet'):
-        css_url = link.get('href')
-        if css_url:
-            links.append(css_url)
-    return links
-
-def fetch_and_extract_colors_from_external_css(css_url, headers):
-    css_text = fetch_external_css(css_url, headers)
-    accent_colors = extract_accent_colors_from_css(css_text)
-    background_colors = extract_background_colors_from_css(css_text)
-    border_colors = extract_border_colors_from_css(css_text)
-    color_patterns = extract_color_patterns_from_css(css_text)
-    form_field_colors = extract_form_field_colors_from_css(css_text)
-    gradient_colors = extract_gradient_colors_from_css(css_text)
-    interactive_element_colors = extract_interactive_element_colors_from_css(css_text)
-    mouse_state_colors = extract_mouse_state_colors_from_css(css_text)
-    notification_colors = extract_notification_colors_from_css(css_text)
-    primary_colors = extract_primary_colors_from_css(css_text)
-    secondary_colors = extract_secondary_colors_from_css(css_text)
-    text_colors = extract_text_colors_from_css(css_text)
+@memoize_css
+@offload_large
+def extract_colors_from_external_css(css_text):
+    # One tokenizer pass feeds every category filter
+    literals = scan_color_literals(css_text)
+    accent_colors = extract_accent_colors_from_literals(literals)
+    background_colors = extract_background_colors_from_literals(literals)
+    border_colors = extract_border_colors_from_literals(literals)
+    color_patterns = extract_color_patterns_from_literals(literals)
+    form_field_colors = extract_form_field_colors_from_literals(literals)
+    gradient_colors = extract_gradient_colors_from_literals(literals)
+    interactive_element_colors = extract_interactive_element_colors_from_literals(literals)
+    mouse_state_colors = extract_mouse_state_colors_from_literals(literals)
+    notification_colors = extract_notification_colors_from_literals(literals)
+    primary_colors = extract_primary_colors_from_literals(literals)
+    secondary_colors = extract_secondary_colors_from_literals(literals)
+    text_colors = extract_text_colors_from_literals(literals)
+    button_colors = extract_button_colors_from_literals(literals)
     return (accent_colors, background_colors, border_colors, color_patterns, form_field_colors,
             gradient_colors, interactive_element_colors, mouse_state_colors, notification_colors,
-            primary_colors, secondary_colors, text_colors)
+            primary_colors, secondary_colors, text_colors, button_colors)
 
-def scrape_colors(url):
-
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, 'html.parser')
+def scrape_colors(page):
+    """Extract colors from a PageContext that was fetched once for the whole scrape job."""
+    # Every inline and <style> tag extractor reads the same one-traversal collection
+    sources = page.style_sources
 
     # Extract inline and <style> tag colors
-    inline_accent_colors = extract_accent_colors_from_inline_styles(soup)
-    style_accent_colors = extract_accent_colors_from_styles(soup)
-    inline_background_colors = extract_background_colors_from_inline_styles(soup)
-    style_background_colors = extract_background_colors_from_styles(soup)
-    inline_border_colors = extract_border_colors_from_inline_styles(soup)
-    style_border_colors = extract_border_colors_from_styles(soup)
-    inline_color_patterns = extract_color_patterns_from_inline_styles(soup)
-    style_color_patterns = extract_color_patterns_from_styles(soup)
-    inline_form_field_colors = extract_form_field_colors_from_inline_styles(soup)
-    style_form_field_colors = extract_form_field_colors_from_styles(soup)
-    inline_gradient_colors = extract_gradient_colors_from_inline_styles(soup)
-    style_gradient_colors = extract_gradient_colors_from_styles(soup)
-    inline_interactive_element_colors = extract_interactive_element_colors_from_inline_styles(soup)
-    style_interactive_element_colors = extract_interactive_element_colors_from_styles(soup)
-    inline_mouse_state_colors = extract_mouse_state_colors_from_inline_styles(soup)
-    style_mouse_state_colors = extract_mouse_state_colors_from_styles(soup)
-    inline_notification_colors = extract_notification_colors_from_inline_styles(soup)
-    style_notification_colors = extract_notification_colors_from_styles(soup)
-    inline_primary_colors = extract_primary_colors_from_inline_styles(soup)
-    style_primary_colors = extract_primary_colors_from_styles(soup)
-    inline_secondary_colors = extract_secondary_colors_from_inline_styles(soup)
-    style_secondary_colors = extract_secondary_colors_from_styles(soup)
+    inline_accent_colors = extract_accent_colors_from_inline_styles(sources)
+    style_accent_colors = extract_accent_colors_from_styles(sources)
+    inline_background_colors = extract_background_colors_from_inline_styles(sources)
+    style_background_colors = extract_background_colors_from_styles(sources)
+    inline_border_colors = extract_border_colors_from_inline_styles(sources)
+    style_border_colors = extract_border_colors_from_styles(sources)
+    inline_color_patterns = extract_color_patterns_from_inline_styles(sources)
+    style_color_patterns = extract_color_patterns_from_styles(sources)
+    inline_form_field_colors = extract_form_field_colors_from_inline_styles(sources)
+    style_form_field_colors = extract_form_field_colors_from_styles(sources)
+    inline_gradient_colors = extract_gradient_colors_from_inline_styles(sources)
+    style_gradient_colors = extract_gradient_colors_from_styles(sources)
+    inline_interactive_element_colors = extract_interactive_element_colors_from_inline_styles(sources)
+    style_interactive_element_colors = extract_interactive_element_colors_from_styles(sources)
+    inline_mouse_state_colors = extract_mouse_state_colors_from_inline_styles(sources)
+    style_mouse_state_colors = extract_mouse_state_colors_from_styles(sources)
+    inline_notification_colors = extract_notification_colors_from_inline_styles(sources)
+    style_notification_colors = extract_notification_colors_from_styles(sources)
+    inline_primary_colors = extract_primary_colors_from_inline_styles(sources)
+    style_primary_colors = extract_primary_colors_from_styles(sources)
+    inline_secondary_colors = extract_secondary_colors_from_inline_styles(sources)
+    style_secondary_colors = extract_secondary_colors_from_styles(sources)
     
-    inline_text_colors = extract_text_colors_from_inline_styles(soup)
-    style_text_colors = extract_text_colors_from_styles(soup)
-    inline_background_colors_for_text = extract_background_colors_from_inline_styles_for_text(soup)
-    style_background_colors_for_text = extract_background_colors_from_styles_for_text(soup)
+    inline_text_colors = extract_text_colors_from_inline_styles(sources)
+    style_text_colors = extract_text_colors_from_styles(sources)
+    inline_background_colors_for_text = extract_background_colors_from_inline_styles_for_text(sources)
+    style_background_colors_for_text = extract_background_colors_from_styles_for_text(sources)
+
+    inline_button_colors = extract_button_colors_from_inline_styles(sources)
+    style_button_colors = extract_button_colors_from_styles(sources)
 
-    inline_button_colors = extract_button_colors_from_inline_styles(soup)
-    style_button_colors = extract_button_colors_from_styles(soup)
+    feedback_colors = extract_feedback_colors(sources)
+    shadows_and_overlays = extract_shadows_and_overlays(sources)
+    opacity_levels = extract_opacity_levels(sources)
 
-    feedback_colors = extract_feedback_colors(soup)
-    shadows_and_overlays = extract_shadows_and_overlays(soup)
-    opacity_levels = extract_opacity_levels(soup)
+    # Resolve color declarations against the DOM to weight each color by the elements it paints
+    cascade = CascadeIndex(page.soup, sources, page.deadline)
+    for style_content, order in zip(sources.style_blocks, page.style_block_orders):
+        cascade.add_css(style_content, order)
+    stylesheet_slots = dict(page.stylesheet_slots)
 
     # Fetch external CSS links
-    external_css_links = get_external_css_links(soup)
+    external_css_links = page.stylesheets
     external_accent_colors = set()
     external_background_colors = set()
     external_border_colors = set()
@@ -119,16 +114,20 @@ def scrape_colors(url):
     external_secondary_colors = set()
     external_text_colors = set()
     external_button_colors = set() 
-    external_feedback_colors = {'error_colors': set(), 'success_colors': set()}
-    external_shadows_and_overlays = {'shadows': set(), 'overlays': set()}
-    external_opacity_levels = set()
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
-    for css_url in external_css_links:
+
+    # Stylesheets download concurrently and are extracted as each one arrives
+    for stylesheet in page.resources.fetch_all(external_css_links):
+        if page.deadline.expired():
+            page.deadline.skip('external stylesheet colors')
+            break
+        try:
+            with offload_deadline(page.deadline):
+                extracted = extract_colors_from_external_css(stylesheet.text)
+        except DeadlineExceeded:
+            # The offloaded extraction ran out of time and already marked the results partial
+            break
         (accent, background, border, patterns, form_fields, gradients, interactive_elements,
-         mouse_states, notifications, primary, secondary, text_colors) = fetch_and_extract_colors_from_external_css(css_url, headers)
+         mouse_states, notifications, primary, secondary, text_colors, buttons) = extracted
         external_accent_colors.update(accent)
         external_background_colors.update(background)
         external_border_colors.update(border)
@@ -141,10 +140,8 @@ def scrape_colors(url):
         external_primary_colors.update(primary)
         external_secondary_colors.update(secondary)
         external_text_colors.update(text_colors)
-        external_button_colors.update(extract_button_colors_from_css(fetch_external_css(css_url, headers)))
-        external_feedback_colors.update(extract_feedback_colors(soup))
-        external_shadows_and_overlays.update(extract_shadows_and_overlays(soup))
-        external_opacity_levels.update(extract_opacity_levels(soup))
+        external_button_colors.update(buttons)
+        cascade.add_css(stylesheet.text, stylesheet_rule_order(stylesheet_slots, stylesheet))
 
     # Combine all colors
     all_accent_colors = inline_accent_colors.union(style_accent_colors, external_accent_colors)
@@ -170,15 +167,17 @@ def scrape_colors(url):
     all_background_colors_for_text = inline_background_colors_for_text.union(style_background_colors_for_text, external_background_colors_for_text)
 
     all_button_colors = inline_button_colors.union(style_button_colors, external_button_colors)
-    all_feedback_colors = {
-        'error_colors': feedback_colors['error_colors'].union(external_feedback_colors['error_colors']),
-        'success_colors': feedback_colors['success_colors'].union(external_feedback_colors['success_colors'])
-    }
-    all_shadows_and_overlays = {
-        'shadows': shadows_and_overlays['shadows'].union(external_shadows_and_overlays['shadows']),
-        'overlays': shadows_and_overlays['overlays'].union(external_shadows_and_overlays['overlays'])
-    }
-    all_opacity_levels = opacity_levels.union(external_opacity_levels)
+    # Feedback, shadow and opacity data come from the page's own styles only
+    all_feedback_colors = feedback_colors
+    all_shadows_and_overlays = shadows_and_overlays
+    all_opacity_levels = opacity_levels
+
+    color_weights = {}
+    if cascade.abandoned or page.deadline.expired():
+        page.deadline.skip('color weights')
+    else:
+        cascade.add_inline_styles()
+        color_weights = cascade.color_weights()
 
     return {
         'accent_colors': all_accent_colors,
@@ -197,6 +196,7 @@ def scrape_colors(url):
         'button_colors': all_button_colors,
         'feedback_colors': all_feedback_colors,
         'shadows_and_overlays': all_shadows_and_overlays,
-        'opacity_levels': all_opacity_levels 
+        'opacity_levels': all_opacity_levels,
+        'color_weights': color_weights
     }
 
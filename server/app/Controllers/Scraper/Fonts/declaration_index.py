@@ -0,0 +1,81 @@
+import re
+import logging
+from app.Controllers.Scraper.css_parser import iter_declarations
+from app.Controllers.Scraper.extraction_cache import memoize_css
+from app.Controllers.Scraper.style_sources import get_style_sources
+
+# CSS property behind each typography output of scrape_fonts
+TYPOGRAPHY_PROPERTIES = {
+    'font_families': 'font-family',
+    'font_sizes': 'font-size',
+    'font_styles': 'font-style',
+    'font_variants': 'font-variant',
+    'font_weights': 'font-weight',
+    'letter_spacing': 'letter-spacing',
+    'line_heights': 'line-height',
+    'text_alignments': 'text-align',
+    'text_colors': 'color',
+    'text_decorations': 'text-decoration',
+    'text_overflow': 'text-overflow',
+    'text_shadows': 'text-shadow',
+    'text_transforms': 'text-transform',
+    'word_spacing': 'word-spacing',
+}
+INDEXED_PROPERTIES = frozenset(TYPOGRAPHY_PROPERTIES.values())
+IMPORTANT_PATTERN = re.compile(r'!\s*important\s*$', re.IGNORECASE)
+
+
+class DeclarationIndex:
+    """Typography declaration values of one or more CSS sources, grouped by property in source order."""
+
+    def __init__(self):
+        self.values = {}
+
+    def add(self, prop, value):
+        value = IMPORTANT_PATTERN.sub('', value).rstrip()
+        if value:
+            self.values.setdefault(prop, []).append(value)
+
+    def get(self, prop):
+        return self.values.get(prop, [])
+
+    def update(self, other):
+        for prop, values in other.values.items():
+            self.values.setdefault(prop, []).extend(values)
+
+
+@memoize_css
+def build_declaration_index(css_text):
+    """Parse a CSS source once and index the values of every typography property."""
+    logging.debug("Indexing typography declarations")
+    return index_declarations(iter_declarations(css_text))
+
+
+def index_declarations(declarations, index=None):
+    """Add the typography values of already parsed declarations to index, or to a new one."""
+    index = index if index is not None else DeclarationIndex()
+    for declaration in declarations:
+        if declaration.property in INDEXED_PROPERTIES:
+            index.add(declaration.property, declaration.value)
+    return index
+
+
+def index_inline_styles(sources):
+    """Index distinct inline style attributes, keeping the first value of each property per attribute."""
+    index = DeclarationIndex()
+    for style in get_style_sources(sources).style_counts:
+        seen = set()
+        for declaration in iter_declarations(style):
+            if declaration.property in INDEXED_PROPERTIES and declaration.property not in seen:
+                seen.add(declaration.property)
+                index.add(declaration.property, declaration.value)
+    return index
+
+
+def index_style_tags(sources):
+    """Index the contents of every <style> tag."""
+    index = DeclarationIndex()
+    for style_content in get_style_sources(sources).style_blocks:
+        if style_content:
+            index.update(build_declaration_index(style_content))
+    return index
@@ -1,5 +1,24 @@
-from bs4 import BeautifulSoup
-import re
+from app.Controllers.Scraper.html_parser import parse_html
+from app.Controllers.Scraper.Fonts.declaration_index import build_declaration_index, index_inline_styles, index_style_tags
+
+def split_font_families(value):
+    """Splits a font-family value into individual family names without quotes."""
+    return [font.strip().strip('"').strip("'") for font in value.split(',')]
+
+def extract_font_families_from_index(index):
+    """
+    Looks up all font-family declarations in a declaration index.
+
+    Args:
+    index (DeclarationIndex): Typography declarations of one or more CSS sources.
+
+    Returns:
+    list of str: A list of unique font families found in the index.
+    """
+    fonts = set()
+    for value in index.get('font-family'):
+        fonts.update(split_font_families(value))
+    return list(fonts)
 
 def extract_font_families_from_css(css_text):
     """
@@ -11,15 +30,7 @@ def extract_font_families_from_css(css_text):
     Returns:
     list of str: A list of unique font families found in the CSS text.
     """
-    fonts = set()
-    # Regular expression to find font-family declarations
-    matches = re.findall(r'font-family:\s*([^;]+)', css_text, re.IGNORECASE)
-    for match in matches:
-        # Clean and split the fonts by comma
-        individual_fonts = [font.strip().strip('"').strip("'") for font in match.split(',')]
-        fonts.update(individual_fonts)
-
-    return list(fonts)
+    return extract_font_families_from_index(build_declaration_index(css_text))
 
 def extract_inline_font_families(html_data):
     """
@@ -31,53 +42,28 @@ def extract_inline_font_families(html_data):
     Returns:
     list of str: A list of unique font families found in the inline styles.
     """
-    soup = BeautifulSoup(html_data, 'lxml')
-    fonts = set()
-
-    # Find all elements with a style attribute
-    for element in soup.find_all(style=True):
-        style_content = element['style']
-        # Look for font-family within each style attribute
-        match = re.search(r'font-family:\s*([^;]+)', style_content)
-        if match:
-            # Clean and split the fonts by comma
-            individual_fonts = [font.strip().strip('"').strip("'") for font in match.group(1).split(',')]
-            fonts.update(individual_fonts)
-
-    return list(fonts)
+    return extract_font_families_from_inline_styles(parse_html(html_data))
 
-def extract_font_families_from_inline_styles(soup):
+def extract_font_families_from_inline_styles(sources):
     """
-    Extracts all font-family declarations from inline styles within a BeautifulSoup object.
+    Extracts all font-family declarations from inline styles within a page.
 
     Args:
-    soup (BeautifulSoup): A BeautifulSoup object containing parsed HTML content.
+    sources (StyleSources): Style attributes and <style> contents collected from the page, or a BeautifulSoup object.
 
     Returns:
     list of str: A list of unique font families found in the inline styles.
     """
-    return extract_inline_font_families(str(soup))
+    return extract_font_families_from_index(index_inline_styles(sources))
 
-def extract_font_families_from_styles(soup):
+def extract_font_families_from_styles(sources):
     """
     Extracts all font-family declarations from <style> tags within an HTML document.
 
     Args:
-    soup (BeautifulSoup): A BeautifulSoup object containing parsed HTML content.
+    sources (StyleSources): Style attributes and <style> contents collected from the page, or a BeautifulSoup object.
 
     Returns:
     list of str: A list of unique font families found in the <style> tags.
     """
-    styles = soup.find_all('style')
-    fonts = set()
-
-    for style in styles:
-        style_content = style.string
-        if style_content:
-            matches = re.findall(r'font-family:\s*([^;]+)', style_content, re.IGNORECASE)
-            for match in matches:
-                # Clean and split the fonts by comma
-                individual_fonts = [font.strip().strip('"').strip("'") for font in match.split(',')]
-                fonts.update(individual_fonts)
-
-    return list(fonts)
+    return extract_font_families_from_index(index_style_tags(sources))
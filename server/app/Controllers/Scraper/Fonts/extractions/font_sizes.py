@@ -1,43 +1,65 @@
-import requests
-from bs4 import BeautifulSoup
-import cssutils
-
-def fetch_css_stylesheets(soup, base_url):
-    """Fetches and returns all CSS rules from stylesheets linked in the HTML."""
-    styles = []
-    for link in soup.find_all('link'):
-        if 'stylesheet' in link.get('rel', []):
-            href = link.get('href')
-            if href:
-                try:
-                    response = requests.get(base_url + href)
-                    sheet = cssutils.parseString(response.content)
-                    styles.extend(sheet.cssRules)
-                except requests.exceptions.RequestException as e:
-                    print(f"Failed to fetch stylesheet: {href}")
-    return styles
-
-def extract_font_sizes_from_css(rules):
-    """Extracts font sizes from CSS rules."""
+import os
+import logging
+from app.Controllers.Scraper.extraction_cache import memoize_css
+from app.Controllers.Scraper.style_sources import get_style_sources
+from app.Controllers.Scraper.Fonts.declaration_index import build_declaration_index, index_inline_styles
+
+# cssutils validates every rule and is many times slower than the declaration parser; opt in for strict parsing
+STRICT_FONT_SIZES = os.getenv('SCRAPER_STRICT_FONT_SIZES', '0') == '1'
+
+def parse_css_rules(css_text):
+    """Parses CSS text into a list of cssutils rules."""
+    import cssutils
+    cssutils.log.setLevel(logging.CRITICAL)
+    return list(cssutils.parseString(css_text).cssRules)
+
+def extract_font_sizes_from_index(index):
+    """Looks up font sizes in a declaration index."""
+    return set(index.get('font-size'))
+
+@memoize_css
+def extract_font_sizes_strict(css_text):
+    """Extracts font sizes from raw CSS text with cssutils, skipping declarations it rejects."""
     font_sizes = set()
-    for rule in rules:
+    for rule in parse_css_rules(css_text):
         if rule.type == rule.STYLE_RULE:
             for property in rule.style:
                 if property.name == 'font-size':
                     font_sizes.add(property.value)
     return font_sizes
 
-def extract_font_sizes_from_inline_styles(soup):
+def extract_font_sizes_from_css(css_text):
+    """Extracts font sizes from raw CSS text."""
+    if STRICT_FONT_SIZES:
+        return extract_font_sizes_strict(css_text)
+    return extract_font_sizes_from_index(build_declaration_index(css_text))
+
+def extract_font_sizes_from_inline_styles(sources):
     """Extracts font sizes from inline styles within the HTML."""
+    if not STRICT_FONT_SIZES:
+        return extract_font_sizes_from_index(index_inline_styles(sources))
+
+    import cssutils
+    cssutils.log.setLevel(logging.CRITICAL)
     font_sizes = set()
-    for element in soup.find_all(style=True):
-        style = cssutils.parseStyle(element['style'])
-        font_size = style.getPropertyValue('font-size')
+    for style_text in get_style_sources(sources).style_counts:
+        font_size = cssutils.parseStyle(style_text).getPropertyValue('font-size')
         if font_size:
             font_sizes.add(font_size)
     return font_sizes
 
-def extract_font_sizes_from_styles(soup, base_url):
-    """Fetches and extracts font sizes from stylesheets linked in the HTML."""
-    css_rules = fetch_css_stylesheets(soup, base_url)
-    return extract_font_sizes_from_css(css_rules)
+def extract_font_sizes_from_style_tags(sources):
+    """Extracts font sizes from the <style> tags of the page."""
+    font_sizes = set()
+    for style_content in get_style_sources(sources).style_blocks:
+        if style_content:
+            font_sizes.update(extract_font_sizes_from_css(style_content))
+    return font_sizes
+
+def extract_font_sizes_from_styles(page):
+    """Extracts font sizes from the stylesheets linked in the page, read through the job's resource store."""
+    font_sizes = set()
+    for stylesheet in page.resources.fetch_all(page.stylesheets):
+        if stylesheet.text:
+            font_sizes.update(extract_font_sizes_from_css(stylesheet.text))
+    return font_sizes
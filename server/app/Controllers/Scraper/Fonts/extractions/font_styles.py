@@ -1,29 +1,17 @@
-import re
+from app.Controllers.Scraper.Fonts.declaration_index import build_declaration_index, index_inline_styles, index_style_tags
+
+def extract_font_styles_from_index(index):
+    """Looks up font styles in a declaration index."""
+    return list(set(index.get('font-style')))
 
 def extract_font_styles_from_css(css_text):
     """Extracts font styles from CSS rules."""
-    styles = set()
-    matches = re.findall(r'font-style:\s*([^;]+)', css_text, re.IGNORECASE)
-    for match in matches:
-        styles.add(match.strip())
-    return list(styles)
+    return extract_font_styles_from_index(build_declaration_index(css_text))
 
-def extract_font_styles_from_inline_styles(soup):
+def extract_font_styles_from_inline_styles(sources):
     """Extracts font styles from inline styles within an HTML document."""
-    styles = set()
-    for element in soup.find_all(style=True):
-        match = re.search(r'font-style:\s*([^;]+)', element['style'], re.IGNORECASE)
-        if match:
-            styles.add(match.group(1).strip())
-    return list(styles)
+    return extract_font_styles_from_index(index_inline_styles(sources))
 
-def extract_font_styles_from_styles(soup):
+def extract_font_styles_from_styles(sources):
     """Extracts font styles from <style> tags within an HTML document."""
-    styles = set()
-    for style in soup.find_all('style'):
-        style_content = style.string
-        if style_content:
-            matches = re.findall(r'font-style:\s*([^;]+)', style_content, re.IGNORECASE)
-            for match in matches:
-                styles.add(match.strip())
-    return list(styles)
+    return extract_font_styles_from_index(index_style_tags(sources))
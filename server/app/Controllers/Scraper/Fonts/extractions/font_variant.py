@@ -1,29 +1,17 @@
-import re
+from app.Controllers.Scraper.Fonts.declaration_index import build_declaration_index, index_inline_styles, index_style_tags
+
+def extract_font_variants_from_index(index):
+    """Looks up font variants in a declaration index."""
+    return list(set(index.get('font-variant')))
 
 def extract_font_variants_from_css(css_text):
     """Extracts font variants from CSS rules."""
-    variants = set()
-    matches = re.findall(r'font-variant:\s*([^;]+)', css_text, re.IGNORECASE)
-    for match in matches:
-        variants.add(match.strip())
-    return list(variants)
+    return extract_font_variants_from_index(build_declaration_index(css_text))
 
-def extract_font_variants_from_inline_styles(soup):
+def extract_font_variants_from_inline_styles(sources):
     """Extracts font variants from inline styles within an HTML document."""
-    variants = set()
-    for element in soup.find_all(style=True):
-        match = re.search(r'font-variant:\s*([^;]+)', element['style'], re.IGNORECASE)
-        if match:
-            variants.add(match.group(1).strip())
-    return list(variants)
+    return extract_font_variants_from_index(index_inline_styles(sources))
 
-def extract_font_variants_from_styles(soup):
+def extract_font_variants_from_styles(sources):
     """Extracts font variants from <style> tags within an HTML document."""
-    variants = set()
-    for style in soup.find_all('style'):
-        style_content = style.string
-        if style_content:
-            matches = re.findall(r'font-variant:\s*([^;]+)', style_content, re.IGNORECASE)
-            for match in matches:
-                variants.add(match.strip())
-    return list(variants)
+    return extract_font_variants_from_index(index_style_tags(sources))
@@ -1,29 +1,17 @@
-import re
+from app.Controllers.Scraper.Fonts.declaration_index import build_declaration_index, index_inline_styles, index_style_tags
+
+def extract_font_weights_from_index(index):
+    """Looks up font weights in a declaration index."""
+    return list(set(index.get('font-weight')))
 
 def extract_font_weights_from_css(css_text):
     """Extracts font weights from CSS rules."""
-    weights = set()
-    matches = re.findall(r'font-weight:\s*([^;]+)', css_text, re.IGNORECASE)
-    for match in matches:
-        weights.add(match.strip())
-    return list(weights)
+    return extract_font_weights_from_index(build_declaration_index(css_text))
 
-def extract_font_weights_from_inline_styles(soup):
+def extract_font_weights_from_inline_styles(sources):
     """Extracts font weights from inline styles within an HTML document."""
-    weights = set()
-    for element in soup.find_all(style=True):
-        match = re.search(r'font-weight:\s*([^;]+)', element['style'], re.IGNORECASE)
-        if match:
-            weights.add(match.group(1).strip())
-    return list(weights)
+    return extract_font_weights_from_index(index_inline_styles(sources))
 
-def extract_font_weights_from_styles(soup):
+def extract_font_weights_from_styles(sources):
     """Extracts font weights from <style> tags within an HTML document."""
-    weights = set()
-    for style in soup.find_all('style'):
-        style_content = style.string
-        if style_content:
-            matches = re.findall(r'font-weight:\s*([^;]+)', style_content, re.IGNORECASE)
-            for match in matches:
-                weights.add(match.strip())
-    return list(weights)
+    return extract_font_weights_from_index(index_style_tags(sources))
@@ -1,29 +1,17 @@
-import re
+from app.Controllers.Scraper.Fonts.declaration_index import build_declaration_index, index_inline_styles, index_style_tags
+
+def extract_letter_spacing_from_index(index):
+    """Looks up letter spacing in a declaration index."""
+    return list(set(index.get('letter-spacing')))
 
 def extract_letter_spacing_from_css(css_text):
     """Extracts letter spacing from CSS rules."""
-    spacings = set()
-    matches = re.findall(r'letter-spacing:\s*([^;]+)', css_text, re.IGNORECASE)
-    for match in matches:
-        spacings.add(match.strip())
-    return list(spacings)
+    return extract_letter_spacing_from_index(build_declaration_index(css_text))
 
-def extract_letter_spacing_from_inline_styles(soup):
+def extract_letter_spacing_from_inline_styles(sources):
     """Extracts letter spacing from inline styles within an HTML document."""
-    spacings = set()
-    for element in soup.find_all(style=True):
-        match = re.search(r'letter-spacing:\s*([^;]+)', element['style'], re.IGNORECASE)
-        if match:
-            spacings.add(match.group(1).strip())
-    return list(spacings)
+    return extract_letter_spacing_from_index(index_inline_styles(sources))
 
-def extract_letter_spacing_from_styles(soup):
+def extract_letter_spacing_from_styles(sources):
     """Extracts letter spacing from <style> tags within an HTML document."""
-    spacings = set()
-    for style in soup.find_all('style'):
-        style_content = style.string
-        if style_content:
-            matches = re.findall(r'letter-spacing:\s*([^;]+)', style_content, re.IGNORECASE)
-            for match in matches:
-                spacings.add(match.strip())
-    return list(spacings)
+    return extract_letter_spacing_from_index(index_style_tags(sources))
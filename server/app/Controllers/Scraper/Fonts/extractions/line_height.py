@@ -1,29 +1,17 @@
-import re
+from app.Controllers.Scraper.Fonts.declaration_index import build_declaration_index, index_inline_styles, index_style_tags
+
+def extract_line_heights_from_index(index):
+    """Looks up line heights in a declaration index."""
+    return list(set(index.get('line-height')))
 
 def extract_line_heights_from_css(css_text):
     """Extracts line heights from CSS rules."""
-    heights = set()
-    matches = re.findall(r'line-height:\s*([^;]+)', css_text, re.IGNORECASE)
-    for match in matches:
-        heights.add(match.strip())
-    return list(heights)
+    return extract_line_heights_from_index(build_declaration_index(css_text))
 
-def extract_line_heights_from_inline_styles(soup):
+def extract_line_heights_from_inline_styles(sources):
     """Extracts line heights from inline styles within an HTML document."""
-    heights = set()
-    for element in soup.find_all(style=True):
-        match = re.search(r'line-height:\s*([^;]+)', element['style'], re.IGNORECASE)
-        if match:
-            heights.add(match.group(1).strip())
-    return list(heights)
+    return extract_line_heights_from_index(index_inline_styles(sources))
 
-def extract_line_heights_from_styles(soup):
+def extract_line_heights_from_styles(sources):
     """Extracts line heights from <style> tags within an HTML document."""
-    heights = set()
-    for style in soup.find_all('style'):
-        style_content = style.string
-        if style_content:
-            matches = re.findall(r'line-height:\s*([^;]+)', style_content, re.IGNORECASE)
-            for match in matches:
-                heights.add(match.strip())
-    return list(heights)
+    return extract_line_heights_from_index(index_style_tags(sources))
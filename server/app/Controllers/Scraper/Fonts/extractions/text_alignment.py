@@ -1,29 +1,17 @@
-import re
+from app.Controllers.Scraper.Fonts.declaration_index import build_declaration_index, index_inline_styles, index_style_tags
+
+def extract_text_alignments_from_index(index):
+    """Looks up text alignments in a declaration index."""
+    return list(set(index.get('text-align')))
 
 def extract_text_alignments_from_css(css_text):
     """Extracts text alignments from CSS rules."""
-    alignments = set()
-    matches = re.findall(r'text-align:\s*([^;]+)', css_text, re.IGNORECASE)
-    for match in matches:
-        alignments.add(match.strip())
-    return list(alignments)
+    return extract_text_alignments_from_index(build_declaration_index(css_text))
 
-def extract_text_alignments_from_inline_styles(soup):
+def extract_text_alignments_from_inline_styles(sources):
     """Extracts text alignments from inline styles within an HTML document."""
-    alignments = set()
-    for element in soup.find_all(style=True):
-        match = re.search(r'text-align:\s*([^;]+)', element['style'], re.IGNORECASE)
-        if match:
-            alignments.add(match.group(1).strip())
-    return list(alignments)
+    return extract_text_alignments_from_index(index_inline_styles(sources))
 
-def extract_text_alignments_from_styles(soup):
+def extract_text_alignments_from_styles(sources):
     """Extracts text alignments from <style> tags within an HTML document."""
-    alignments = set()
-    for style in soup.find_all('style'):
-        style_content = style.string
-        if style_content:
-            matches = re.findall(r'text-align:\s*([^;]+)', style_content, re.IGNORECASE)
-            for match in matches:
-                alignments.add(match.strip())
-    return list(alignments)
+    return extract_text_alignments_from_index(index_style_tags(sources))
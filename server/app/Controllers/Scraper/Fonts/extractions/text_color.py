@@ -1,29 +1,17 @@
-import re
+from app.Controllers.Scraper.Fonts.declaration_index import build_declaration_index, index_inline_styles, index_style_tags
+
+def extract_text_colors_from_index(index):
+    """Looks up text colors in a declaration index."""
+    return list(set(index.get('color')))
 
 def extract_text_colors_from_css(css_text):
     """Extracts text colors from CSS rules."""
-    colors = set()
-    matches = re.findall(r'color:\s*([^;]+)', css_text, re.IGNORECASE)
-    for match in matches:
-        colors.add(match.strip())
-    return list(colors)
+    return extract_text_colors_from_index(build_declaration_index(css_text))
 
-def extract_text_colors_from_inline_styles(soup):
+def extract_text_colors_from_inline_styles(sources):
     """Extracts text colors from inline styles within an HTML document."""
-    colors = set()
-    for element in soup.find_all(style=True):
-        match = re.search(r'color:\s*([^;]+)', element['style'], re.IGNORECASE)
-        if match:
-            colors.add(match.group(1).strip())
-    return list(colors)
+    return extract_text_colors_from_index(index_inline_styles(sources))
 
-def extract_text_colors_from_styles(soup):
+def extract_text_colors_from_styles(sources):
     """Extracts text colors from <style> tags within an HTML document."""
-    colors = set()
-    for style in soup.find_all('style'):
-        style_content = style.string
-        if style_content:
-            matches = re.findall(r'color:\s*([^;]+)', style_content, re.IGNORECASE)
-            for match in matches:
-                colors.add(match.strip())
-    return list(colors)
+    return extract_text_colors_from_index(index_style_tags(sources))
@@ -1,30 +1,17 @@
-import re
+from app.Controllers.Scraper.Fonts.declaration_index import build_declaration_index, index_inline_styles, index_style_tags
+
+def extract_text_decorations_from_index(index):
+    """Looks up text decorations in a declaration index."""
+    return list(set(index.get('text-decoration')))
 
 def extract_text_decorations_from_css(css_text):
     """Extracts text decorations from CSS rules."""
-    decorations = set()
-    matches = re.findall(r'text-decoration:\s*([^;]+)', css_text, re.IGNORECASE)
-    for match in matches:
-        decorations.add(match.strip())
-    return list(decorations)
+    return extract_text_decorations_from_index(build_declaration_index(css_text))
 
-def extract_text_decorations_from_inline_styles(soup):
+def extract_text_decorations_from_inline_styles(sources):
     """Extracts text decorations from inline styles within an HTML document."""
-    decorations = set()
-    for element in soup.find_all(style=True):
-        match = re.search(r'text-decoration:\s*([^;]+)', element['style'], re.IGNORECASE)
-        if match:
-            decorations.add(match.group(1).strip())
-    return list(decorations)
+    return extract_text_decorations_from_index(index_inline_styles(sources))
 
-def extract_text_decorations_from_styles(soup):
+def extract_text_decorations_from_styles(sources):
     """Extracts text decorations from <style> tags within an HTML document."""
-    decorations = set()
-    for style in soup.find_all('style'):
-        style_content = style.string
-        if style_content:
-            matches = re.findall(r'text-decoration:\s*([^;]+)', style_content, re.IGNORECASE)
-            for match in matches:
-                decorations.add(match.strip())
-    return list(decorations)
-
+    return extract_text_decorations_from_index(index_style_tags(sources))
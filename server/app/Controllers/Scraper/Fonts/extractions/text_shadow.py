@@ -1,29 +1,17 @@
-import re
+from app.Controllers.Scraper.Fonts.declaration_index import build_declaration_index, index_inline_styles, index_style_tags
+
+def extract_text_shadows_from_index(index):
+    """Looks up text shadows in a declaration index."""
+    return list(set(index.get('text-shadow')))
 
 def extract_text_shadows_from_css(css_text):
     """Extracts text shadows from CSS rules."""
-    shadows = set()
-    matches = re.findall(r'text-shadow:\s*([^;]+)', css_text, re.IGNORECASE)
-    for match in matches:
-        shadows.add(match.strip())
-    return list(shadows)
+    return extract_text_shadows_from_index(build_declaration_index(css_text))
 
-def extract_text_shadows_from_inline_styles(soup):
+def extract_text_shadows_from_inline_styles(sources):
     """Extracts text shadows from inline styles within an HTML document."""
-    shadows = set()
-    for element in soup.find_all(style=True):
-        match = re.search(r'text-shadow:\s*([^;]+)', element['style'], re.IGNORECASE)
-        if match:
-            shadows.add(match.group(1).strip())
-    return list(shadows)
+    return extract_text_shadows_from_index(index_inline_styles(sources))
 
-def extract_text_shadows_from_styles(soup):
+def extract_text_shadows_from_styles(sources):
     """Extracts text shadows from <style> tags within an HTML document."""
-    shadows = set()
-    for style in soup.find_all('style'):
-        style_content = style.string
-        if style_content:
-            matches = re.findall(r'text-shadow:\s*([^;]+)', style_content, re.IGNORECASE)
-            for match in matches:
-                shadows.add(match.strip())
-    return list(shadows)
+    return extract_text_shadows_from_index(index_style_tags(sources))
@@ -1,29 +1,17 @@
-import re
+from app.Controllers.Scraper.Fonts.declaration_index import build_declaration_index, index_inline_styles, index_style_tags
+
+def extract_text_transforms_from_index(index):
+    """Looks up text transforms in a declaration index."""
+    return list(set(index.get('text-transform')))
 
 def extract_text_transforms_from_css(css_text):
     """Extracts text transforms from CSS rules."""
-    transforms = set()
-    matches = re.findall(r'text-transform:\s*([^;]+)', css_text, re.IGNORECASE)
-    for match in matches:
-        transforms.add(match.strip())
-    return list(transforms)
+    return extract_text_transforms_from_index(build_declaration_index(css_text))
 
-def extract_text_transforms_from_inline_styles(soup):
+def extract_text_transforms_from_inline_styles(sources):
     """Extracts text transforms from inline styles within an HTML document."""
-    transforms = set()
-    for element in soup.find_all(style=True):
-        match = re.search(r'text-transform:\s*([^;]+)', element['style'], re.IGNORECASE)
-        if match:
-            transforms.add(match.group(1).strip())
-    return list(transforms)
+    return extract_text_transforms_from_index(index_inline_styles(sources))
 
-def extract_text_transforms_from_styles(soup):
+def extract_text_transforms_from_styles(sources):
     """Extracts text transforms from <style> tags within an HTML document."""
-    transforms = set()
-    for style in soup.find_all('style'):
-        style_content = style.string
-        if style_content:
-            matches = re.findall(r'text-transform:\s*([^;]+)', style_content, re.IGNORECASE)
-            for match in matches:
-                transforms.add(match.strip())
-    return list(transforms)
+    return extract_text_transforms_from_index(index_style_tags(sources))
@@ -1,29 +1,17 @@
-import re
+from app.Controllers.Scraper.Fonts.declaration_index import build_declaration_index, index_inline_styles, index_style_tags
+
+def extract_word_spacing_from_index(index):
+    """Looks up word spacing in a declaration index."""
+    return list(set(index.get('word-spacing')))
 
 def extract_word_spacing_from_css(css_text):
     """Extracts word spacing from CSS rules."""
-    spacings = set()
-    matches = re.findall(r'word-spacing:\s*([^;]+)', css_text, re.IGNORECASE)
-    for match in matches:
-        spacings.add(match.strip())
-    return list(spacings)
+    return extract_word_spacing_from_index(build_declaration_index(css_text))
 
-def extract_word_spacing_from_inline_styles(soup):
+def extract_word_spacing_from_inline_styles(sources):
     """Extracts word spacing from inline styles within an HTML document."""
-    spacings = set()
-    for element in soup.find_all(style=True):
-        match = re.search(r'word-spacing:\s*([^;]+)', element['style'], re.IGNORECASE)
-        if match:
-            spacings.add(match.group(1).strip())
-    return list(spacings)
+    return extract_word_spacing_from_index(index_inline_styles(sources))
 
-def extract_word_spacing_from_styles(soup):
+def extract_word_spacing_from_styles(sources):
     """Extracts word spacing from <style> tags within an HTML document."""
-    spacings = set()
-    for style in soup.find_all('style'):
-        style_content = style.string
-        if style_content:
-            matches = re.findall(r'word-spacing:\s*([^;]+)', style_content, re.IGNORECASE)
-            for match in matches:
-                spacings.add(match.strip())
-    return list(spacings)
+    return extract_word_spacing_from_index(index_style_tags(sources))
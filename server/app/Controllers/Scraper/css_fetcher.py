@@ -0,0 +1,202 @@
+import re
+import hashlib
+import logging
+import threading
+import requests
+from collections import deque
+from app.Controllers.Scraper.http_client import MAX_CSS_BYTES, fetch_capped
+from app.Controllers.Scraper.css_parser import STRUCTURE_PATTERN
+from app.Controllers.Scraper.http_cache import get_http_cache
+from app.Controllers.Scraper.css_stream import STREAM_CSS, CSSStreamParser
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+
+# Upper bound on stylesheet downloads in flight at once, across all hosts
+MAX_CONCURRENT_FETCHES = 16
+# Upper bound on simultaneous downloads from a single host
+MAX_FETCHES_PER_HOST = 4
+
+IMPORT_PATTERN = re.compile(r'@import\s+(?:url\(\s*[\'"]?([^\'")\s]+)[\'"]?\s*\)|[\'"]([^\'"]+)[\'"])', re.IGNORECASE)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process-wide thread pool used for stylesheet downloads."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FETCHES, thread_name_prefix='css-fetch')
+        return _executor
+
+
+def import_prelude(css_text):
+    """Return the text before a stylesheet's first block with comments removed.
+
+    Browsers only honour @import before the first rule, and a rule or group at-rule opens the
+    first block. Comments and strings come from the tokenizer's structure pattern, so a '{' in
+    a string or an @import in a comment is not mistaken for real CSS.
+    """
+    pieces = []
+    start = 0
+    for token in STRUCTURE_PATTERN.finditer(css_text):
+        char = css_text[token.start()]
+        if char == '}':
+            continue
+        pieces.append(css_text[start:token.start()])
+        if char == '{':
+            return ''.join(pieces)
+        if char != '/':
+            pieces.append(token.group(0))
+        start = token.end()
+    pieces.append(css_text[start:])
+    return ''.join(pieces)
+
+
+def find_css_imports(css_text, base_url):
+    """Return the absolute URLs of the @import rules that precede a stylesheet's first rule, in source order."""
+    imports = []
+    for url_form, string_form in IMPORT_PATTERN.findall(import_prelude(css_text)):
+        href = url_form or string_form
+        if href and not href.startswith('data:'):
+            imports.append(urljoin(base_url, href))
+    return list(dict.fromkeys(imports))
+
+
+class Stylesheet:
+    """A downloaded stylesheet.
+
+    from_cache is set when the body came from the HTTP cache without a download. truncated is set
+    when the body hit the byte cap, and rejected names why a non-text response was dropped.
+    """
+
+    def __init__(self, url, text, digest=None, from_cache=False, truncated=False, rejected=None):
+        self.url = url
+        self.text = text
+        self.digest = digest
+        self.from_cache = from_cache
+        self.truncated = truncated
+        self.rejected = rejected
+
+    @property
+    def incomplete(self):
+        return self.truncated or self.rejected is not None
+
+    @property
+    def imports(self):
+        if not hasattr(self, '_imports'):
+            self._imports = find_css_imports(self.text, self.url) if self.text else []
+        return self._imports
+
+
+def fetch_stylesheet(css_url, headers=None, deadline=None):
+    """Download a stylesheet through the HTTP cache, revalidating stale entries with their validators."""
+    cache = get_http_cache()
+    entry = cache.load(css_url) if cache else None
+    if entry is not None and entry.is_fresh():
+        logging.debug(f"Fresh cache hit for {css_url}")
+        return Stylesheet(css_url, entry.text, entry.digest, from_cache=True)
+
+    request_headers = dict(headers or {})
+    if entry is not None:
+        request_headers.update(entry.conditional_headers())
+    logging.debug(f"Fetching external CSS: {css_url}")
+    stream = CSSStreamParser() if STREAM_CSS else None
+    try:
+        response = fetch_capped(css_url, MAX_CSS_BYTES, headers=request_headers, deadline=deadline, stream=stream)
+        if response.status_code == 304 and entry is not None:
+            logging.debug(f"Revalidated cached CSS for {css_url}")
+            entry.refresh(response.headers)
+            cache.save_meta(entry)
+            return Stylesheet(css_url, entry.text, entry.digest, from_cache=True)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        logging.error(f"Failed to fetch external CSS from {css_url}: {e}")
+        return Stylesheet(css_url, "")
+
+    if response.rejected:
+        return Stylesheet(css_url, "", rejected=response.rejected)
+    if cache and not response.truncated:
+        cache.store(css_url, response)
+    css_text = response.text
+    if stream is not None:
+        stream.finish(css_text)
+    return Stylesheet(css_url, css_text, hashlib.sha256(response.content).hexdigest(), truncated=response.truncated)
+
+
+def fetch_external_css(css_url, headers):
+    """Download a single stylesheet and return its text, or an empty string on failure."""
+    return fetch_stylesheet(css_url, headers).text
+
+
+class StylesheetFetcher:
+    """Downloads stylesheets concurrently with a global cap and a per-host connection limit.
+
+    The per-host limit is enforced before downloads reach the shared executor: a host's downloads
+    beyond per_host_limit wait in a queue and are submitted as earlier ones finish, so a page with
+    many stylesheets on one CDN never parks pool threads that other scrapes could use.
+    """
+
+    def __init__(self, headers=None, per_host_limit=MAX_FETCHES_PER_HOST, deadline=None):
+        self.headers = headers
+        self.deadline = deadline
+        self.per_host_limit = per_host_limit
+        self._active = {}  # host -> downloads submitted to the executor
+        self._queued = {}  # host -> deque of (css_url, future) waiting for a slot
+        self._lock = threading.Lock()
+
+    def _fetch(self, css_url):
+        if self.deadline is not None and self.deadline.expired():
+            self.deadline.skip('stylesheet downloads')
+            return Stylesheet(css_url, "", rejected='deadline')
+        return fetch_stylesheet(css_url, self.headers, self.deadline)
+
+    def submit(self, css_url):
+        """Schedule a download and return a future resolving to a Stylesheet.
+
+        The future can be cancelled while its download is still queued for a host slot.
+        """
+        future = Future()
+        host = urlparse(css_url).netloc
+        with self._lock:
+            if self._active.get(host, 0) >= self.per_host_limit:
+                self._queued.setdefault(host, deque()).append((css_url, future))
+                return future
+            self._active[host] = self._active.get(host, 0) + 1
+        self._start(host, css_url, future)
+        return future
+
+    def _start(self, host, css_url, future):
+        """Hand a download holding one of host's slots to the executor, or pass the slot on if it was cancelled."""
+        if not future.set_running_or_notify_cancel():
+            self._release(host)
+            return
+        try:
+            download = get_executor().submit(self._fetch, css_url)
+        except RuntimeError as e:  # Executor shut down
+            future.set_exception(e)
+            self._release(host)
+            return
+        download.add_done_callback(lambda done: self._finish(host, future, done))
+
+    def _finish(self, host, future, download):
+        exception = download.exception()
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(download.result())
+        self._release(host)
+
+    def _release(self, host):
+        """Give a freed host slot to the next queued download, or return it."""
+        with self._lock:
+            queue = self._queued.get(host)
+            if not queue:
+                self._active[host] -= 1
+                if not self._active[host]:
+                    del self._active[host]
+                self._queued.pop(host, None)
+                return
+            css_url, future = queue.popleft()
+        self._start(host, css_url, future)
@@ -0,0 +1,176 @@
+import os
+import re
+import time
+import logging
+from collections import namedtuple
+
+# Structural tokens: comments, strings and braces. Everything else is sliced out between them.
+STRUCTURE_PATTERN = re.compile(r'/\*.*?(?:\*/|\Z)|"(?:\\.|[^"\\\n])*"?|\'(?:\\.|[^\'\\\n])*\'?|[{}]', re.DOTALL)
+# One declaration inside a block; parentheses and strings may contain ';' (e.g. data: URLs).
+# The lookbehind keeps a long run of word characters without a ':' from being retried at every offset.
+DECLARATION_PATTERN = re.compile(r'(?<![-\w])([-\w]+)\s*:\s*((?:[^;("\']|\([^)]*\)?|"[^"]*"?|\'[^\']*\'?)*)')
+# At-rules whose blocks hold nested rules rather than declarations
+GROUP_AT_RULES = {'media', 'supports', 'document', 'layer', 'container', 'scope', 'starting-style', 'keyframes'}
+
+# CPU seconds one stylesheet may spend in the tokenizer before the rest of it is ignored
+CSS_CPU_SECONDS = float(os.getenv('SCRAPER_CSS_CPU_SECONDS', '2'))
+# Tokens scanned between CPU budget checks
+BUDGET_CHECK_INTERVAL = 512
+
+Declaration = namedtuple('Declaration', ['selector', 'property', 'value', 'position'])
+
+
+def _at_rule_name(prelude):
+    name = prelude[1:].split(None, 1)[0].split('(', 1)[0].lower() if len(prelude) > 1 else ''
+    if name.startswith('-'):
+        # Vendor prefixed at-rules such as @-webkit-keyframes
+        name = name.split('-', 2)[-1]
+    return name
+
+
+def iter_function_calls(text, opening):
+    """Yield (call, arguments) for every match of opening, such as rgba\\(, closed by the next ')'.
+
+    Gives the same results as finditer over opening + r'([^)]+)\\)', which backtracks quadratically
+    over calls that are never closed, in linear time: once no ')' is left, no later call can close.
+    """
+    resume = 0
+    for match in opening.finditer(text):
+        if match.start() < resume:
+            continue
+        close = text.find(')', match.end())
+        if close == -1:
+            return
+        if close > match.end():
+            resume = close + 1
+            yield text[match.start():close + 1], text[match.end():close]
+
+
+def _declarations(text, offset, selector):
+    for match in DECLARATION_PATTERN.finditer(text):
+        value = match.group(2).strip()
+        if value:
+            yield Declaration(selector, match.group(1).lower(), value, offset + match.start())
+
+
+def iter_declarations(css_text):
+    """Yield a Declaration(selector, property, value, position) for every declaration in one linear pass.
+
+    Text without any '{' is treated as a style attribute, whose declarations get the selector ''.
+    Rules nested in @media, @supports and similar blocks keep their own selector. position is
+    the offset of the declaration in css_text, approximate only when a comment precedes it in
+    the same block.
+    """
+    if '{' not in css_text:
+        yield from _declarations(css_text, 0, '')
+        return
+    yield from DeclarationStream(css_text)._scan(final=True)
+
+
+def _unterminated(token):
+    """True for a comment or string token cut off by the end of the text seen so far."""
+    text = token.group(0)
+    if text[0] == '/':
+        return len(text) < 4 or not text.endswith('*/')
+    return len(text) < 2 or text[-1] != text[0] or text[-2] == '\\'
+
+
+class DeclarationStream:
+    """Incremental form of iter_declarations for a stylesheet that arrives in chunks.
+
+    feed() returns the declarations completed by the new text, close() those left at the end of
+    the stylesheet. Text after the last brace is kept and scanned again with the next chunk, so a
+    comment, string or declaration split across chunks comes out the same as in one pass.
+
+    A stylesheet that spends more than cpu_budget seconds of thread CPU time in the tokenizer,
+    including the consumer's work between declarations, is cut short: exhausted is set and the
+    rest of it is ignored.
+    """
+
+    def __init__(self, text='', cpu_budget=CSS_CPU_SECONDS):
+        self.buffer = text
+        self.offset = 0  # position of buffer[0] in the whole stylesheet
+        self.stack = []  # selector of each open block, None for at-rule groups
+        self.cpu_budget = cpu_budget
+        self.cpu_used = 0.0
+        self.exhausted = False
+
+    def feed(self, text):
+        if self.exhausted:
+            return []
+        self.buffer += text
+        return list(self._scan(final=False))
+
+    def close(self):
+        declarations = list(self._scan(final=True))
+        self.buffer = ''
+        return declarations
+
+    def _scan(self, final):
+        started = time.thread_time()
+        try:
+            yield from self._tokens(final, started)
+        finally:
+            self.cpu_used += time.thread_time() - started
+
+    def _over_budget(self, started, position):
+        if self.cpu_used + time.thread_time() - started <= self.cpu_budget:
+            return False
+        logging.warning(f"CSS tokenizer gave up at offset {position} after {self.cpu_budget}s of CPU time")
+        self.exhausted = True
+        self.buffer = ''
+        return True
+
+    def _tokens(self, final, started):
+        css_text = self.buffer
+        offset = self.offset
+        stack = self.stack
+        pieces = []  # segment text preceding a comment
+        start = 0
+        segment_start = 0
+        limit = len(css_text) - 1
+        for count, token in enumerate(STRUCTURE_PATTERN.finditer(css_text)):
+            if count % BUDGET_CHECK_INTERVAL == 0 and self._over_budget(started, offset + token.start()):
+                return
+            char = css_text[token.start()]
+            if char == '"' or char == "'" or char == '/':
+                if not final and token.end() >= limit and _unterminated(token):
+                    # Wait for the rest of the comment or string
+                    break
+                if char == '/':
+                    pieces.append(css_text[start:token.start()])
+                    start = token.end()
+                continue
+
+            text = css_text[start:token.start()]
+            if pieces:
+                text = ''.join(pieces) + text
+                pieces = []
+            in_rule = bool(stack) and stack[-1] is not None
+
+            if char == '{':
+                head, _, prelude = text.rpartition(';')
+                if in_rule and head:
+                    # Declarations before a nested rule, as in native CSS nesting
+                    yield from _declarations(head, offset + segment_start, stack[-1])
+                prelude = ' '.join(prelude.split())
+                if prelude.startswith('@') and _at_rule_name(prelude) in GROUP_AT_RULES:
+                    stack.append(None)
+                else:
+                    stack.append(prelude)
+            else:
+                if in_rule:
+                    yield from _declarations(text, offset + segment_start, stack[-1])
+                if stack:
+                    stack.pop()
+            start = segment_start = token.end()
+
+        if not final:
+            # Keep the open segment; it is scanned again once more text arrives
+            self.buffer = css_text[segment_start:]
+            self.offset = offset + segment_start
+            return
+
+        if stack and stack[-1] is not None:
+            # Unclosed final block, typically a truncated stylesheet
+            yield from _declarations(''.join(pieces) + css_text[start:], offset + segment_start, stack[-1])
@@ -0,0 +1,73 @@
+import os
+import codecs
+import logging
+from app.Controllers.Scraper.css_parser import DeclarationStream
+from app.Controllers.Scraper.extraction_pool import PROCESS_POOL_MIN_CHARS, offload_enabled
+from app.Controllers.Scraper.Colors.extractions.color_literals import scan_color_literals, color_literals_from_declarations
+from app.Controllers.Scraper.Fonts.declaration_index import DeclarationIndex, build_declaration_index, index_declarations
+
+# Parse stylesheets while they download, so extraction is ready as soon as the last byte arrives
+STREAM_CSS = os.getenv('SCRAPER_STREAM_CSS', '1') == '1'
+
+
+class CSSStreamParser:
+    """Tokenizes a stylesheet chunk by chunk as fetch_capped reads it from the network.
+
+    Color literals and the typography index are built from each batch of completed declarations.
+    finish() checks the streamed text against the final decoded body and, when they agree, primes
+    the extraction cache so scan_color_literals and build_declaration_index return immediately.
+    Bundles that grow past PROCESS_POOL_MIN_CHARS are dropped from the stream while the process
+    pool is enabled, so their tokenizing runs in a worker instead of under this process's GIL.
+    """
+
+    def __init__(self):
+        self.decoder = None
+        self.parts = []
+        self.declarations = DeclarationStream()
+        self.literals = []
+        self.index = DeclarationIndex()
+        self.size = 0
+        self.abandoned = False
+
+    def start(self, encoding):
+        """Pick the decoder once response headers are known; undeclared encodings are read as UTF-8."""
+        try:
+            self.decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+        except LookupError:
+            self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    def feed(self, chunk):
+        if self.abandoned:
+            return
+        text = self.decoder.decode(chunk)
+        self.size += len(text)
+        if self.size >= PROCESS_POOL_MIN_CHARS and offload_enabled():
+            self.abandoned = True
+            self.parts = self.literals = None
+            self.declarations = self.index = None
+            return
+        if text:
+            self.parts.append(text)
+            self._add(self.declarations.feed(text))
+
+    def _add(self, declarations):
+        self.literals.extend(color_literals_from_declarations(declarations))
+        index_declarations(declarations, self.index)
+
+    def finish(self, css_text):
+        """Close the stream and prime the extraction cache if it saw exactly css_text."""
+        if self.decoder is None or self.abandoned or '{' not in css_text:
+            # Text without a block is parsed as a style attribute by iter_declarations
+            return False
+        tail = self.decoder.decode(b'', final=True)
+        if tail:
+            self.parts.append(tail)
+            self._add(self.declarations.feed(tail))
+        self._add(self.declarations.close())
+        if ''.join(self.parts) != css_text:
+            # The body was decoded with a sniffed encoding that differs from the streamed guess
+            logging.debug("Streamed CSS differs from the decoded body, extracting it again")
+            return False
+        scan_color_literals.prime(css_text, self.literals)
+        build_declaration_index.prime(css_text, self.index)
+        return True
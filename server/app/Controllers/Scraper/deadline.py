@@ -0,0 +1,64 @@
+import os
+import math
+import time
+import logging
+import threading
+
+# Total time allowed for one /api/scrape request, in seconds
+SCRAPE_BUDGET_SECONDS = float(os.getenv('SCRAPE_BUDGET_SECONDS', '25'))
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a stage starts after the scrape's time budget has run out."""
+
+
+class Deadline:
+    """Time budget for one scrape job, passed down through fetching, extraction and analysis.
+
+    Stages call check() before starting work and skip() when they give up early, which
+    marks the job's results as partial. A Deadline built with seconds=None never expires.
+    """
+
+    def __init__(self, seconds=SCRAPE_BUDGET_SECONDS):
+        self.seconds = seconds
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+        self.skipped = []
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        if self.expires_at is None:
+            return math.inf
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def check(self, stage):
+        """Raise DeadlineExceeded, recording the stage as skipped, if the budget is spent."""
+        if self.expired():
+            self.skip(stage)
+            raise DeadlineExceeded(f"Time budget of {self.seconds}s exhausted before {stage}")
+
+    def skip(self, stage):
+        with self._lock:
+            if stage not in self.skipped:
+                logging.warning(f"Deadline reached, skipping {stage}")
+                self.skipped.append(stage)
+
+    @property
+    def partial(self):
+        return bool(self.skipped)
+
+    def wait_timeout(self):
+        """Timeout for blocking waits: None when unbounded, else the time left."""
+        return None if self.expires_at is None else self.remaining()
+
+    def request_timeout(self, default):
+        """Shrink a requests (connect, read) timeout so it cannot outlive the budget."""
+        remaining = self.remaining()
+        if remaining == math.inf:
+            return default
+        remaining = max(remaining, 0.1)
+        if isinstance(default, tuple):
+            return tuple(min(part, remaining) for part in default)
+        return min(default, remaining)
@@ -0,0 +1,202 @@
+import os
+import pickle
+import hashlib
+import logging
+import tempfile
+import threading
+import functools
+from collections import OrderedDict
+
+# Entries kept in the in-process LRU
+MEMORY_MAX_ENTRIES = int(os.getenv('SCRAPER_EXTRACTION_CACHE_ENTRIES', '2048'))
+# Approximate size bound of the in-process LRU, counted as the CSS characters each entry was extracted
+# from; intermediate results such as literal lists and declaration indexes grow with their source
+MEMORY_MAX_CHARS = int(os.getenv('SCRAPER_EXTRACTION_CACHE_MAX_CHARS', str(16 * 1024 * 1024)))
+# Optional directory shared between workers; unset keeps the cache in memory only
+DISK_DIR = os.getenv('SCRAPER_EXTRACTION_CACHE_DIR')
+DISK_MAX_BYTES = int(os.getenv('SCRAPER_EXTRACTION_CACHE_MAX_BYTES', str(128 * 1024 * 1024)))
+# CSS shorter than this (typically inline style attributes) is cheaper to extract than to hash
+MIN_MEMO_CHARS = 512
+# Results at least this large in CSS characters are also written to the disk store
+MIN_DISK_CHARS = 8 * 1024
+# Bump when extractor output changes shape so stale disk entries are ignored
+CACHE_VERSION = 2
+
+
+def css_digest(css_text):
+    """Content hash of a CSS source, used as the cache key."""
+    return hashlib.blake2b(css_text.encode('utf-8', errors='surrogatepass'), digest_size=20).hexdigest()
+
+
+class ExtractionCache:
+    """Two-level cache of CSS extractor results keyed by (extractor, content hash).
+
+    The first level is an in-process LRU bounded both by entry count and by the total length
+    of the CSS its entries came from. The second, optional level is a directory of pickles
+    that every worker on the machine can share.
+    """
+
+    def __init__(self, max_entries=MEMORY_MAX_ENTRIES, directory=DISK_DIR, disk_max_bytes=DISK_MAX_BYTES, max_chars=MEMORY_MAX_CHARS):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.chars = 0
+        self.directory = directory
+        self.disk_max_bytes = disk_max_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get_or_compute(self, name, css_text, extract):
+        digest = css_digest(css_text)
+        key = (name, digest)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+
+        use_disk = self.directory and len(css_text) >= MIN_DISK_CHARS
+        if use_disk:
+            found, result = self._load(name, digest)
+            if found:
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, result, len(css_text))
+                return result
+
+        with self._lock:
+            self.misses += 1
+        result = extract(css_text)
+        self._remember(key, result, len(css_text))
+        if use_disk:
+            self._dump(name, digest, result)
+        return result
+
+    def put(self, name, css_text, result):
+        """Store a result computed elsewhere, such as while the CSS was still downloading."""
+        self._remember((name, css_digest(css_text)), result, len(css_text))
+
+    def _remember(self, key, result, chars):
+        if chars > self.max_chars:
+            # Would evict everything else; the disk store, when enabled, still keeps it
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.chars -= previous[1]
+            self._entries[key] = (result, chars)
+            self.chars += chars
+            while len(self._entries) > self.max_entries or self.chars > self.max_chars:
+                _, (_, evicted_chars) = self._entries.popitem(last=False)
+                self.chars -= evicted_chars
+
+    def _path(self, name, digest):
+        name_digest = hashlib.blake2b(f'{CACHE_VERSION}:{name}'.encode('utf-8'), digest_size=8).hexdigest()
+        return os.path.join(self.directory, f'{digest}-{name_digest}.pickle')
+
+    def _load(self, name, digest):
+        path = self._path(name, digest)
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+            os.utime(path)
+            return True, result
+        except FileNotFoundError:
+            return False, None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            logging.warning(f"Ignoring unreadable extraction cache entry {path}: {e}")
+            return False, None
+
+    def _dump(self, name, digest, result):
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(name, digest))
+        except (OSError, pickle.PicklingError) as e:
+            logging.warning(f"Could not write extraction cache entry for {name}: {e}")
+            return
+        with self._lock:
+            self._disk_writes += 1
+            should_evict = self._disk_writes % 64 == 0
+        if should_evict:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        files = []
+        total = 0
+        for item in os.scandir(self.directory):
+            if item.is_file() and item.name.endswith('.pickle'):
+                stat = item.stat()
+                files.append((stat.st_mtime, stat.st_size, item.path))
+                total += stat.st_size
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def hit_ratio(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hit_ratio(), 3),
+            'entries': len(self._entries),
+            'chars': self.chars,
+        }
+
+    def log_stats(self):
+        logging.info(f"Extraction cache: {self.hits} memory hits, {self.disk_hits} disk hits, "
+                     f"{self.misses} misses, hit ratio {self.hit_ratio():.1%}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_extraction_cache():
+    """Return the process-wide extraction cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = ExtractionCache()
+            except OSError as e:
+                logging.warning(f"Extraction disk cache disabled, cannot use {DISK_DIR}: {e}")
+                _cache = ExtractionCache(directory=None)
+        return _cache
+
+
+def memoize_css(extract):
+    """Decorator that memoizes a CSS extractor by the content hash of its CSS text argument.
+
+    Results are shared between callers and must not be mutated.
+    """
+    name = f'{extract.__module__}.{extract.__qualname__}'
+
+    @functools.wraps(extract)
+    def wrapper(css_text, *args, **kwargs):
+        if args or kwargs or not isinstance(css_text, str) or len(css_text) < MIN_MEMO_CHARS:
+            return extract(css_text, *args, **kwargs)
+        return get_extraction_cache().get_or_compute(name, css_text, extract)
+
+    def prime(css_text, result):
+        """Record result as the output for css_text, so the next call is a cache hit."""
+        if isinstance(css_text, str) and len(css_text) >= MIN_MEMO_CHARS:
+            get_extraction_cache().put(name, css_text, result)
+
+    wrapper.prime = prime
+    return wrapper
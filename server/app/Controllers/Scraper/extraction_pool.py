@@ -0,0 +1,170 @@
+import os
+import logging
+import importlib
+import threading
+import functools
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as PoolTimeout
+from concurrent.futures.process import BrokenProcessPool
+from app.Controllers.Scraper.deadline import DeadlineExceeded
+
+# CSS at least this long is extracted in a worker process instead of holding the GIL in the request thread
+PROCESS_POOL_MIN_CHARS = int(os.getenv('SCRAPER_PROCESS_POOL_MIN_CHARS', str(512 * 1024)))
+# Worker processes kept for large extractions; 0 keeps every extraction inline
+PROCESS_POOL_WORKERS = int(os.getenv('SCRAPER_PROCESS_POOL_WORKERS', str(max(1, (os.cpu_count() or 2) // 2))))
+# multiprocessing start method of the workers. Never fork by default: the pool starts lazily from a
+# request thread while download threads run, and a forked child can inherit a held lock and hang.
+PROCESS_POOL_START_METHOD = os.getenv('SCRAPER_PROCESS_POOL_START_METHOD') or ('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+# Longest wait in seconds for an offloaded extraction before the worker is taken as stuck and the
+# extraction runs inline; the calling thread's deadline, set with offload_deadline, can shorten it
+PROCESS_POOL_TIMEOUT = float(os.getenv('SCRAPER_PROCESS_POOL_TIMEOUT', '30'))
+
+# Set in worker processes, where every extraction runs inline
+_in_worker = False
+# Per-thread deadline bounding waits on the pool
+_context = threading.local()
+
+
+def _mark_worker():
+    global _in_worker
+    _in_worker = True
+
+
+def _run_in_worker(module_name, qualname, css_text):
+    """Look the extractor up by name in the worker, since decorated functions cannot be pickled directly."""
+    extract = getattr(importlib.import_module(module_name), qualname)
+    return extract(css_text)
+
+
+class OffloadStats:
+    """Counts how many large-source extractions went to the process pool versus stayed inline."""
+
+    def __init__(self):
+        self.offloaded = 0
+        self.inline = 0
+        self.failed = 0
+        self.offloaded_chars = 0
+        self._lock = threading.Lock()
+
+    def record(self, offloaded, chars=0):
+        with self._lock:
+            if offloaded:
+                self.offloaded += 1
+                self.offloaded_chars += chars
+            else:
+                self.inline += 1
+
+    def record_failure(self):
+        with self._lock:
+            self.failed += 1
+
+    def hit_rate(self):
+        calls = self.offloaded + self.inline
+        return self.offloaded / calls if calls else 0.0
+
+    def stats(self):
+        return {
+            'offloaded': self.offloaded,
+            'inline': self.inline,
+            'failed': self.failed,
+            'offloaded_chars': self.offloaded_chars,
+            'hit_rate': round(self.hit_rate(), 3),
+            'min_chars': PROCESS_POOL_MIN_CHARS,
+        }
+
+    def log_stats(self):
+        logging.info(f"Extraction pool: {self.offloaded} offloaded, {self.inline} inline, {self.failed} failed, "
+                     f"hit rate {self.hit_rate():.1%} at {PROCESS_POOL_MIN_CHARS} chars")
+
+
+offload_stats = OffloadStats()
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def offload_enabled():
+    return PROCESS_POOL_WORKERS > 0 and not _in_worker
+
+
+@contextlib.contextmanager
+def offload_deadline(deadline):
+    """Bound this thread's waits on offloaded extractions by the deadline's remaining time."""
+    previous = getattr(_context, 'deadline', None)
+    _context.deadline = deadline
+    try:
+        yield
+    finally:
+        _context.deadline = previous
+
+
+def offload_timeout():
+    """Seconds to wait for an offloaded extraction: PROCESS_POOL_TIMEOUT, shortened by the thread's deadline."""
+    deadline = getattr(_context, 'deadline', None)
+    remaining = deadline.wait_timeout() if deadline is not None else None
+    return PROCESS_POOL_TIMEOUT if remaining is None else min(PROCESS_POOL_TIMEOUT, remaining)
+
+
+def get_process_pool():
+    """Return the process-wide pool for large extractions, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            context = multiprocessing.get_context(PROCESS_POOL_START_METHOD)
+            _pool = ProcessPoolExecutor(max_workers=PROCESS_POOL_WORKERS, mp_context=context, initializer=_mark_worker)
+            logging.debug(f"Started extraction pool with {PROCESS_POOL_WORKERS} workers")
+        return _pool
+
+
+def _discard_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+def offload_large(extract):
+    """Decorator that runs a CSS extractor in the process pool when its CSS text is at least PROCESS_POOL_MIN_CHARS.
+
+    The extractor must be a module-level function returning plain picklable data. Smaller sources
+    run inline so they skip the pickling round trip. A pool failure, or a worker giving no result
+    within PROCESS_POOL_TIMEOUT, falls back to inline. When the thread's deadline runs out first,
+    the extraction is dropped instead: the deadline records the skip and DeadlineExceeded is raised,
+    so memoize_css never stores a result for the CSS and the caller treats the source as empty.
+    """
+    module_name = extract.__module__
+    qualname = extract.__qualname__
+
+    @functools.wraps(extract)
+    def wrapper(css_text):
+        if not offload_enabled() or len(css_text) < PROCESS_POOL_MIN_CHARS:
+            if not _in_worker:
+                offload_stats.record(False)
+            return extract(css_text)
+        future = None
+        try:
+            future = get_process_pool().submit(_run_in_worker, module_name, qualname, css_text)
+            result = future.result(timeout=offload_timeout())
+        except PoolTimeout:
+            future.cancel()
+            offload_stats.record_failure()
+            deadline = getattr(_context, 'deadline', None)
+            if deadline is not None and deadline.expired():
+                deadline.skip('large stylesheet extraction')
+                raise DeadlineExceeded(f"Time budget of {deadline.seconds}s exhausted during offloaded {qualname}")
+            logging.warning(f"Offloaded {qualname} gave no result in {PROCESS_POOL_TIMEOUT}s, extracting inline")
+            return extract(css_text)
+        except BrokenProcessPool as e:
+            logging.warning(f"Extraction pool broke while running {qualname} ({e}), restarting it and extracting inline")
+            offload_stats.record_failure()
+            _discard_pool()
+            return extract(css_text)
+        except Exception as e:
+            logging.warning(f"Offloaded {qualname} failed ({e}), extracting inline")
+            offload_stats.record_failure()
+            return extract(css_text)
+        offload_stats.record(True, len(css_text))
+        return result
+
+    return wrapper
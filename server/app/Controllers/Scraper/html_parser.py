@@ -0,0 +1,95 @@
+import os
+import logging
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+from bs4.element import Tag
+
+# BeautifulSoup tree builder used for every page; lxml is several times faster than html.parser
+HTML_PARSER = os.getenv('SCRAPER_HTML_PARSER', 'lxml')
+# Pure-Python builder used when the preferred one is missing or gives up on broken markup
+FALLBACK_PARSER = 'html.parser'
+# Opt-in mode that only builds the nodes the scraper reads, cutting parse time and peak memory
+PARTIAL_PARSE = os.getenv('SCRAPER_PARTIAL_PARSE', '0') == '1'
+PARTIAL_PARSE_TAGS = frozenset(['style', 'link', 'img', 'meta', 'title'])
+# Keeping a styled <html> or <body> would keep the whole document, so only their attributes are kept
+ROOT_TAGS = frozenset(['html', 'body'])
+
+
+def parse_html(content, parser=None, **kwargs):
+    """Parse markup with the configured backend, falling back to html.parser when it fails.
+
+    lxml occasionally returns an empty tree for badly broken documents instead of raising, so
+    an empty result for non-empty input is treated as a failure too.
+    """
+    parser = parser or HTML_PARSER
+    if parser != FALLBACK_PARSER:
+        try:
+            soup = BeautifulSoup(content, parser, **kwargs)
+            if soup.find() is not None or not content or not content.strip():
+                return soup
+            logging.warning(f"{parser} produced an empty tree, retrying with {FALLBACK_PARSER}")
+        except FeatureNotFound:
+            logging.warning(f"HTML parser {parser} is not installed, using {FALLBACK_PARSER}")
+        except Exception as e:
+            logging.warning(f"{parser} failed to parse the document ({e}), retrying with {FALLBACK_PARSER}")
+    return BeautifulSoup(content, FALLBACK_PARSER, **kwargs)
+
+
+class StyleStrainer(SoupStrainer):
+    """parse_only filter for partial parsing, recording styled root tags in root_attrs.
+
+    The test needs both the tag name and its attributes, which SoupStrainer's constructor
+    arguments can only AND together, so the per-tag hook is overridden instead: search_tag
+    before bs4 4.13 and allow_tag_creation from 4.13 on.
+    """
+
+    def __init__(self, root_attrs):
+        super().__init__()
+        self.root_attrs = root_attrs
+
+    def keep(self, name, attrs):
+        attrs = attrs or {}
+        if name in ROOT_TAGS:
+            if attrs.get('style'):
+                self.root_attrs[name] = dict(attrs)
+            return False
+        if name in PARTIAL_PARSE_TAGS:
+            return True
+        if name == 'script':
+            return bool(attrs.get('src'))
+        return bool(attrs.get('style'))
+
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        return self.keep(markup_name, markup_attrs)
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self.keep(name, attrs)
+
+
+def parse_partial_html(content, parser=None):
+    """Parse only <style>, <link>, <script src>, <img>, <meta>, <title> and elements with a style attribute.
+
+    Kept elements come back as top-level nodes with their own subtrees, so selectors that rely on
+    a dropped ancestor (such as 'header img') no longer match. A styled <html> or <body> is
+    re-added as an empty tag carrying its attributes.
+    """
+    root_attrs = {}
+    soup = parse_html(content, parser, parse_only=StyleStrainer(root_attrs))
+    for name, attrs in root_attrs.items():
+        if isinstance(attrs.get('class'), str):
+            attrs['class'] = attrs['class'].split()
+        soup.append(soup.new_tag(name, attrs=attrs))
+    return soup
+
+
+def parse_page(content):
+    """Parse a downloaded page, partially when SCRAPER_PARTIAL_PARSE is enabled."""
+    return parse_partial_html(content) if PARTIAL_PARSE else parse_html(content)
+
+
+def ensure_soup(source):
+    """Return a parsed tree for a soup, a PageContext, or raw HTML markup."""
+    if isinstance(source, Tag):
+        return source
+    if isinstance(source, (str, bytes)):
+        return parse_html(source)
+    return source.soup
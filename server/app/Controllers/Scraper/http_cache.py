@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from email.utils import parsedate_to_datetime
+
+CACHE_ENABLED = os.getenv('SCRAPER_HTTP_CACHE', '1') != '0'
+CACHE_DIR = os.getenv('SCRAPER_HTTP_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'colormind-http-cache'))
+CACHE_MAX_BYTES = int(os.getenv('SCRAPER_HTTP_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+# Responses with a Last-Modified but no explicit lifetime stay fresh for 10% of their age, capped here
+MAX_HEURISTIC_FRESHNESS = 24 * 60 * 60
+# Eviction frees space down to this share of max_bytes, so the next writes do not rescan the directory
+EVICT_TO_FRACTION = 0.9
+
+
+def parse_cache_control(value):
+    """Parse a Cache-Control header into a dict of lowercase directives."""
+    directives = {}
+    for part in (value or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, argument = part.partition('=')
+        directives[name.strip().lower()] = argument.strip().strip('"') or True
+    return directives
+
+
+def _http_date(value):
+    try:
+        return parsedate_to_datetime(value).timestamp() if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+class CacheEntry:
+    """A cached response body together with the validators and freshness data needed to reuse it."""
+
+    def __init__(self, url, body, meta):
+        self.url = url
+        self.body = body
+        self.meta = meta
+
+    @property
+    def digest(self):
+        return self.meta.get('digest')
+
+    @property
+    def text(self):
+        return self.body.decode(self.meta.get('encoding') or 'utf-8', errors='replace')
+
+    def freshness_lifetime(self):
+        directives = parse_cache_control(self.meta.get('cache_control'))
+        if 'no-cache' in directives:
+            return 0
+        for name in ('s-maxage', 'max-age'):
+            if name in directives:
+                try:
+                    return max(int(directives[name]), 0)
+                except ValueError:
+                    return 0
+        expires = _http_date(self.meta.get('expires'))
+        if expires is not None:
+            date = _http_date(self.meta.get('date')) or self.meta['stored_at']
+            return max(expires - date, 0)
+        last_modified = _http_date(self.meta.get('last_modified'))
+        if last_modified is not None:
+            return min((self.meta['stored_at'] - last_modified) / 10, MAX_HEURISTIC_FRESHNESS)
+        return 0
+
+    def is_fresh(self):
+        return time.time() - self.meta['stored_at'] < self.freshness_lifetime()
+
+    def conditional_headers(self):
+        headers = {}
+        if self.meta.get('etag'):
+            headers['If-None-Match'] = self.meta['etag']
+        if self.meta.get('last_modified'):
+            headers['If-Modified-Since'] = self.meta['last_modified']
+        return headers
+
+    def refresh(self, response_headers):
+        """Apply the headers of a 304 response to the stored metadata."""
+        for header, key in (('Cache-Control', 'cache_control'), ('Expires', 'expires'), ('Date', 'date'),
+                            ('ETag', 'etag'), ('Last-Modified', 'last_modified')):
+            if header in response_headers:
+                self.meta[key] = response_headers[header]
+        self.meta['stored_at'] = time.time()
+
+
+class HttpCache:
+    """Size-bounded on-disk HTTP cache with least-recently-used eviction.
+
+    Writes add to a running byte total, and the directory is only scanned when that total passes
+    max_bytes. Each scan resets the total to what is really on disk, which also picks up entries
+    written by other workers sharing the directory.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._bytes = None  # approximate bytes on disk, unknown until the first scan
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + '.body', base + '.json'
+
+    def load(self, url):
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        self._touch(body_path, meta_path)
+        return CacheEntry(url, body, meta)
+
+    def store(self, url, response):
+        """Cache a 200 response unless it forbids storage. Returns the new entry, or None."""
+        directives = parse_cache_control(response.headers.get('Cache-Control'))
+        if response.status_code != 200 or 'no-store' in directives:
+            return None
+        body = response.content
+        meta = {
+            'url': url,
+            'stored_at': time.time(),
+            'digest': hashlib.sha256(body).hexdigest(),
+            'encoding': response.encoding or response.apparent_encoding,
+            'cache_control': response.headers.get('Cache-Control'),
+            'expires': response.headers.get('Expires'),
+            'date': response.headers.get('Date'),
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_type': response.headers.get('Content-Type'),
+        }
+        entry = CacheEntry(url, body, meta)
+        body_path, meta_path = self._paths(url)
+        meta_data = json.dumps(meta).encode('utf-8')
+        try:
+            self._write_atomic(body_path, body)
+            self._write_atomic(meta_path, meta_data)
+        except OSError as e:
+            logging.warning(f"Could not write HTTP cache entry for {url}: {e}")
+            return entry
+        self._added(len(body) + len(meta_data))
+        return entry
+
+    def _added(self, size):
+        """Count newly written bytes, scanning the directory only once the total may exceed max_bytes."""
+        with self._lock:
+            if self._bytes is not None:
+                self._bytes += size
+                if self._bytes <= self.max_bytes:
+                    return
+        self.evict()
+
+    def save_meta(self, entry):
+        _, meta_path = self._paths(entry.url)
+        try:
+            self._write_atomic(meta_path, json.dumps(entry.meta).encode('utf-8'))
+        except OSError as e:
+            logging.warning(f"Could not update HTTP cache entry for {entry.url}: {e}")
+
+    def evict(self):
+        """Remove least recently used entries once the cache exceeds max_bytes, down to EVICT_TO_FRACTION of it."""
+        with self._lock:
+            entries = {}
+            total = 0
+            for item in os.scandir(self.directory):
+                if not item.is_file():
+                    continue
+                key, _, _ = item.name.partition('.')
+                stat = item.stat()
+                size, last_used = entries.get(key, (0, 0))
+                entries[key] = (size + stat.st_size, max(last_used, stat.st_mtime))
+                total += stat.st_size
+            if total > self.max_bytes:
+                for key, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+                    for suffix in ('.body', '.json'):
+                        try:
+                            os.remove(os.path.join(self.directory, key + suffix))
+                        except OSError:
+                            pass
+                    total -= size
+                    if total <= self.max_bytes * EVICT_TO_FRACTION:
+                        break
+            self._bytes = total
+
+    def _touch(self, *paths):
+        for path in paths:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+    def _write_atomic(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache():
+    """Return the process-wide HTTP cache, or None when caching is disabled or unavailable."""
+    global _cache
+    if not CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = HttpCache()
+            except OSError as e:
+                logging.warning(f"HTTP cache disabled, cannot use {CACHE_DIR}: {e}")
+                return None
+        return _cache
+
@@ -0,0 +1,158 @@
+import os
+import logging
+import threading
+import requests
+from requests.compat import chardet
+from requests.utils import get_encoding_from_headers
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds applied to every outbound request
+DEFAULT_TIMEOUT = (5, 20)
+# Number of distinct hosts kept in the connection pool, and connections kept per host
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 16
+MAX_RETRIES = Retry(total=2, connect=2, read=1, backoff_factor=0.2, status_forcelist=(502, 503, 504), allowed_methods=frozenset(['GET', 'HEAD']))
+
+# Byte caps applied to decoded bodies; anything beyond is dropped and the resource flagged as truncated
+MAX_PAGE_BYTES = int(os.getenv('SCRAPER_MAX_PAGE_BYTES', str(5 * 1024 * 1024)))
+MAX_CSS_BYTES = int(os.getenv('SCRAPER_MAX_CSS_BYTES', str(2 * 1024 * 1024)))
+CHUNK_SIZE = 64 * 1024
+
+TEXT_CONTENT_TYPES = ('application/xhtml+xml', 'application/xml', 'application/javascript', 'application/x-javascript')
+BINARY_CONTENT_TYPES = ('image/', 'audio/', 'video/', 'font/', 'application/font', 'application/pdf', 'application/zip',
+                        'application/gzip', 'application/x-font', 'application/vnd.', 'application/wasm')
+BINARY_SIGNATURES = (b'\x89PNG', b'GIF8', b'\xff\xd8\xff', b'%PDF', b'PK\x03\x04', b'\x1f\x8b', b'wOFF', b'wOF2', b'RIFF', b'\x00\x01\x00\x00')
+
+try:
+    import brotli  # noqa: F401 - urllib3 decodes 'br' responses when brotli is importable
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': ACCEPT_ENCODING,
+    'Connection': 'keep-alive',
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide requests session shared by all scraper traffic."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=MAX_RETRIES)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _session = session
+            logging.debug("Created shared HTTP session")
+        return _session
+
+
+def http_get(url, headers=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """GET a URL through the shared keep-alive session with default headers and timeouts."""
+    return get_session().get(url, headers=headers, timeout=timeout, **kwargs)
+
+
+class FetchResult:
+    """A response body read with a byte cap. truncated or rejected explain an incomplete body."""
+
+    def __init__(self, url, response, content, truncated=False, rejected=None):
+        self.url = url
+        self.final_url = response.url
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.content = content
+        self.encoding = get_encoding_from_headers(response.headers)
+        self.truncated = truncated
+        self.rejected = rejected
+        self._response = response
+
+    @property
+    def apparent_encoding(self):
+        return chardet.detect(self.content)['encoding'] if self.content else 'utf-8'
+
+    @property
+    def text(self):
+        try:
+            return self.content.decode(self.encoding or self.apparent_encoding or 'utf-8', errors='replace')
+        except (LookupError, TypeError):
+            # Unknown charset such as utf8mb4; fall back like requests.Response.text does
+            return self.content.decode('utf-8', errors='replace')
+
+    def raise_for_status(self):
+        self._response.raise_for_status()
+
+
+def is_text_content_type(content_type):
+    """True for declared text types, False for declared binary types, None when the header says nothing useful."""
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if not content_type or content_type == 'application/octet-stream':
+        return None
+    if content_type.startswith('text/') or content_type in TEXT_CONTENT_TYPES:
+        return True
+    if content_type.startswith(BINARY_CONTENT_TYPES) or content_type.startswith('application/'):
+        return False
+    return None
+
+
+def looks_binary(chunk):
+    """Sniff the first bytes of a body for NULs or well-known binary file signatures."""
+    head = chunk[:1024]
+    return head.startswith(BINARY_SIGNATURES) or b'\x00' in head
+
+
+def fetch_capped(url, max_bytes, headers=None, timeout=DEFAULT_TIMEOUT, deadline=None, stream=None):
+    """Stream a text resource, stopping at max_bytes and aborting early on non-text responses.
+
+    With a deadline, timeouts are shrunk to the time left and the body is cut short once it expires.
+    A stream, such as a CSSStreamParser, is started with the declared encoding and fed every
+    accepted chunk as it arrives.
+    """
+    if deadline is not None:
+        timeout = deadline.request_timeout(timeout)
+    response = http_get(url, headers=headers, timeout=timeout, stream=True)
+    try:
+        if response.status_code != 200:
+            return FetchResult(url, response, b'')
+        declared_text = is_text_content_type(response.headers.get('Content-Type'))
+        if declared_text is False:
+            logging.warning(f"Skipping {url}: non-text content type {response.headers.get('Content-Type')}")
+            return FetchResult(url, response, b'', rejected='content-type')
+
+        chunks = []
+        size = 0
+        truncated = False
+        if stream is not None:
+            stream.start(get_encoding_from_headers(response.headers))
+        for chunk in response.iter_content(CHUNK_SIZE):
+            if not chunk:
+                continue
+            if size == 0 and declared_text is None and looks_binary(chunk):
+                logging.warning(f"Skipping {url}: body does not look like text")
+                return FetchResult(url, response, b'', rejected='binary')
+            if size + len(chunk) > max_bytes:
+                chunks.append(chunk[:max_bytes - size])
+                if stream is not None:
+                    stream.feed(chunks[-1])
+                size = max_bytes
+                truncated = True
+                logging.warning(f"Truncated {url} at {max_bytes} bytes")
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+            if stream is not None:
+                stream.feed(chunk)
+            if deadline is not None and deadline.expired():
+                truncated = True
+                deadline.skip(f'rest of download {url}')
+                break
+        return FetchResult(url, response, b''.join(chunks), truncated=truncated)
+    finally:
+        response.close()
@@ -1,8 +1,10 @@
 import re
 import requests
 from bs4 import BeautifulSoup
+from app.Controllers.Scraper.html_parser import ensure_soup
 
 def extract_images(soup, base_url):
+    soup = ensure_soup(soup)
     images = set()
     for img in soup.find_all('img'):
         img_url = img.get('src')
@@ -13,6 +15,7 @@ def extract_images(soup, base_url):
     return images
 
 def extract_videos(soup, base_url):
+    soup = ensure_soup(soup)
     videos = set()
     for video in soup.find_all('video'):
         video_url = video.get('src')
@@ -23,6 +26,7 @@ def extract_videos(soup, base_url):
     return videos
 
 def identify_hero_image(soup, base_url):
+    soup = ensure_soup(soup)
     hero_selectors = [
         'header img',
         'img.hero',
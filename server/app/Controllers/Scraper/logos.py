@@ -1,7 +1,9 @@
 import requests
 from bs4 import BeautifulSoup
+from app.Controllers.Scraper.html_parser import ensure_soup
 
 def find_logo(soup, base_url):
+    soup = ensure_soup(soup)
     logo_selectors = [
         'header img',
         'img.logo',
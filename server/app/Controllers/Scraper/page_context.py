@@ -0,0 +1,81 @@
+import logging
+from urllib.parse import urljoin
+from app.Controllers.Scraper.html_parser import parse_page
+from app.Controllers.Scraper.http_client import MAX_PAGE_BYTES, fetch_capped
+from app.Controllers.Scraper.css_fetcher import find_css_imports
+from app.Controllers.Scraper.resource_store import ResourceStore
+from app.Controllers.Scraper.deadline import Deadline
+from app.Controllers.Scraper.style_sources import collect_style_sources
+
+
+def _place(url_slots, url, slot):
+    """Record the slot of a stylesheet URL, keeping the earliest one when it is referenced twice."""
+    current = url_slots.get(url)
+    if current is None or slot < current:
+        url_slots[url] = slot
+
+
+def stylesheet_slots(sources, base_url):
+    """Place every <link> stylesheet, <style> tag and <style> @import in document order.
+
+    A slot is a tuple compared item by item: the <link> or <style> at element index p gets (p,)
+    and its j-th @import gets (p, j). A source's own rules rank at its slot followed by its
+    import count, after everything it imports and before the next source, as in the CSS cascade.
+    Returns ({absolute stylesheet URL: slot}, [rule order of each <style> tag]).
+    """
+    url_slots = {}
+    style_orders = []
+    for href, position in sources.links:
+        _place(url_slots, urljoin(base_url, href), (position,))
+    for css_text, position in zip(sources.style_blocks, sources.style_positions):
+        imports = find_css_imports(css_text, base_url)
+        for j, import_url in enumerate(imports):
+            _place(url_slots, import_url, (position, j))
+        style_orders.append((position, len(imports)))
+    return url_slots, style_orders
+
+
+def stylesheet_rule_order(url_slots, stylesheet):
+    """Slot the @imports of a downloaded stylesheet and return the order its own rules rank at.
+
+    Imports are only known once their importer has downloaded, which is also when fetch_all
+    requests them, so url_slots is extended in place as stylesheets arrive.
+    """
+    slot = url_slots.get(stylesheet.url, (float('inf'),))
+    for j, import_url in enumerate(stylesheet.imports):
+        _place(url_slots, import_url, slot + (j,))
+    return slot + (len(stylesheet.imports),)
+
+
+class PageContext:
+    """A page fetched and parsed once per scrape job and shared by every extractor."""
+
+    def __init__(self, url, content, final_url=None, truncated=False, deadline=None):
+        self.url = url
+        self.content = content
+        self.final_url = final_url or url
+        self.truncated = truncated
+        self.deadline = deadline or Deadline(None)
+        self.soup = parse_page(content)
+        # Style attributes and <style> tags are collected in one traversal shared by every extractor
+        self.style_sources = collect_style_sources(self.soup)
+        # Document-order slots of the stylesheets, used to rank their rules in the color cascade
+        self.stylesheet_slots, self.style_block_orders = stylesheet_slots(self.style_sources, self.final_url)
+        self.stylesheets = sorted(self.stylesheet_slots, key=self.stylesheet_slots.get)
+        self.resources = ResourceStore(deadline=self.deadline)
+        logging.debug(f"Parsed {self.final_url}: {len(self.stylesheets)} external stylesheets")
+
+    def truncated_resources(self):
+        """Return {url: reason} for the page and stylesheets whose bodies were cut short or dropped."""
+        incomplete = {self.final_url: 'truncated'} if self.truncated else {}
+        incomplete.update(self.resources.incomplete_resources())
+        return incomplete
+
+
+def fetch_page_context(url, deadline=None):
+    """Download and parse a page once so colors and fonts can share it."""
+    response = fetch_capped(url, MAX_PAGE_BYTES, deadline=deadline)
+    response.raise_for_status()
+    if response.rejected:
+        raise ValueError(f"{url} did not return an HTML document")
+    return PageContext(url, response.content, response.final_url, truncated=response.truncated, deadline=deadline)
@@ -0,0 +1,113 @@
+import os
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, wait
+from app.Controllers.Scraper.css_fetcher import Stylesheet, StylesheetFetcher
+
+# How many @import levels below a linked stylesheet are followed
+MAX_IMPORT_DEPTH = 4
+# Total bytes of @import-ed stylesheets followed per traversal before further imports are ignored
+MAX_IMPORT_BYTES = int(os.getenv('SCRAPER_MAX_IMPORT_BYTES', str(4 * 1024 * 1024)))
+
+
+class ResourceStore:
+    """Per-job store of downloaded stylesheets keyed by absolute URL.
+
+    Every extractor reads stylesheets through the store, so each URL is downloaded
+    at most once per scrape. Hits and misses are counted to make that verifiable.
+    """
+
+    def __init__(self, fetcher=None, deadline=None):
+        self.deadline = deadline
+        self.fetcher = fetcher or StylesheetFetcher(deadline=deadline)
+        self.hits = 0
+        self.misses = 0
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def _future(self, css_url):
+        with self._lock:
+            future = self._futures.get(css_url)
+            if future is not None:
+                self.hits += 1
+                return future
+            self.misses += 1
+            future = self.fetcher.submit(css_url)
+            self._futures[css_url] = future
+            return future
+
+    def _stylesheet(self, css_url, future):
+        """Result of a finished download; a download that raised becomes an empty Stylesheet."""
+        try:
+            return future.result()
+        except Exception as e:
+            logging.error(f"Failed to fetch external CSS from {css_url}: {e}")
+            return Stylesheet(css_url, "")
+
+    def get(self, css_url):
+        """Return the text of a stylesheet, downloading it on first use."""
+        future = self._future(css_url)
+        return "" if future.cancelled() else self._stylesheet(css_url, future).text
+
+    def fetch_all(self, css_urls, follow_imports=True):
+        """Yield Stylesheets as they become available, downloading only misses.
+
+        @import rules are followed recursively through the same concurrent fetcher. Each URL is
+        visited once per traversal, which also breaks import cycles, and recursion stops at
+        MAX_IMPORT_DEPTH levels or after MAX_IMPORT_BYTES of imported CSS. When the job's
+        deadline passes, downloads still queued are cancelled and the traversal ends early.
+        """
+        depths = {}
+        pending = {}
+        for css_url in dict.fromkeys(css_urls):
+            depths[css_url] = 0
+            pending[self._future(css_url)] = css_url
+        imported_bytes = 0
+
+        while pending:
+            timeout = self.deadline.wait_timeout() if self.deadline is not None else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                for future in pending:
+                    future.cancel()
+                self.deadline.skip('stylesheet downloads')
+                return
+            for future in done:
+                css_url = pending.pop(future)
+                if future.cancelled():
+                    continue
+                stylesheet = self._stylesheet(css_url, future)
+                depth = depths[css_url]
+                if depth > 0:
+                    imported_bytes += len(stylesheet.text)
+                if follow_imports and stylesheet.imports:
+                    if depth >= MAX_IMPORT_DEPTH:
+                        logging.warning(f"Not following @import in {css_url}: depth limit {MAX_IMPORT_DEPTH} reached")
+                    else:
+                        for import_url in stylesheet.imports:
+                            if import_url in depths:
+                                continue
+                            if imported_bytes >= MAX_IMPORT_BYTES:
+                                logging.warning(f"Not following @import {import_url}: {MAX_IMPORT_BYTES} byte import budget spent")
+                                break
+                            depths[import_url] = depth + 1
+                            pending[self._future(import_url)] = import_url
+                yield stylesheet
+
+    def incomplete_resources(self):
+        """Return {url: reason} for downloaded stylesheets that were truncated or rejected."""
+        incomplete = {}
+        with self._lock:
+            futures = dict(self._futures)
+        for css_url, future in futures.items():
+            if future.done() and not future.cancelled() and future.exception() is None:
+                stylesheet = future.result()
+                if stylesheet.incomplete:
+                    incomplete[css_url] = stylesheet.rejected or 'truncated'
+        return incomplete
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'stored': len(self._futures)}
+
+    def log_stats(self):
+        logging.info(f"Stylesheet store: {self.hits} hits, {self.misses} misses, {len(self._futures)} stylesheets")
@@ -4,23 +4,36 @@ from app.Controllers.Scraper.Colors.scrape_colors import scrape_colors
 from app.Controllers.Scraper.Colors.process_colors import process_colors
 from app.Controllers.Scraper.Colors.analyze_colors import analyze_color_results
 from app.Controllers.Scraper.Fonts.scrape_fonts import scrape_fonts
+from app.Controllers.Scraper.page_context import fetch_page_context
+from app.Controllers.Scraper.extraction_cache import get_extraction_cache
+from app.Controllers.Scraper.extraction_pool import offload_stats
+from app.Controllers.Scraper.deadline import Deadline
 
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def process_colors_and_analyze(url):
+def process_colors_and_analyze(url, deadline=None):
     logging.info(f"Starting to scrape and preprocess URL: {url}")
+    deadline = deadline or Deadline(None)
 
     try:
-        # Step 1: Scrape the colors
-        scraped_colors = scrape_colors(url)
+        # Step 1: Fetch and parse the page once, then scrape colors and fonts from it
+        page = fetch_page_context(url, deadline)
+        scraped_colors = scrape_colors(page)
 
-        scraped_fonts = scrape_fonts(url)
+        if deadline.expired():
+            deadline.skip('font scraping')
+            scraped_fonts = {}
+        else:
+            scraped_fonts = scrape_fonts(page)
         logging.debug(f"Scraped Fonts: {scraped_fonts}")
+        page.resources.log_stats()
+        get_extraction_cache().log_stats()
+        offload_stats.log_stats()
 
         # Step 2: Preprocess the scraped colors
-        processed_colors = process_colors(scraped_colors)
+        processed_colors = process_colors(scraped_colors, deadline)
 
 
         
@@ -41,11 +54,14 @@ def process_colors_and_analyze(url):
 
             
             # Analyze the processed colors using ChatGPT
-            analysis = analyze_color_results(formatted_data)
+            analysis = analyze_color_results(formatted_data, deadline)
             return {
                 'scraped_colors': scraped_colors,
                 'processed_colors': processed_colors,
-                'analysis': analysis
+                'analysis': analysis,
+                'truncated_resources': page.truncated_resources(),
+                'partial': deadline.partial,
+                'skipped_stages': list(deadline.skipped)
             }
         else:
             logging.warning("Processed colors are empty. Skipping analysis.")
@@ -54,12 +70,12 @@ def process_colors_and_analyze(url):
         logging.error(f"Error in processing and analyzing colors: {e}")
         return None
 
-def scrape_website(url):
+def scrape_website(url, deadline=None):
 
 
     try:
         # Call the function that handles the scraping and preprocessing process
-        results = process_colors_and_analyze(url)
+        results = process_colors_and_analyze(url, deadline)
 
         # Log the results found
         if results:
@@ -0,0 +1,62 @@
+import logging
+from collections import Counter, namedtuple
+
+InlineStyle = namedtuple('InlineStyle', ['tag', 'classes', 'style'])
+
+
+class StyleSources:
+    """Inline style attributes and <style> tag contents of a page, collected in one DOM traversal.
+
+    style_counts maps each distinct style attribute to the number of elements using it, in
+    first-seen order. Extractors run once per distinct string. Only color_patterns, the Counter
+    that feeds usage weights into process_colors, multiplies by the count; the other color and
+    font categories are sets recording which values occur, so a repeat adds nothing to them.
+    elements lists every element in document order, and inline_positions gives the index in
+    elements of each inline style's element, so the cascade can reuse this traversal.
+    style_positions gives the same index for each <style> tag, and links lists the
+    (href, index) of every <link rel="stylesheet">, so stylesheets can be put in document order.
+    """
+
+    def __init__(self, inline_styles, style_blocks, elements=None, inline_positions=None, style_positions=None, links=None):
+        self.inline_styles = inline_styles
+        self.style_blocks = style_blocks
+        self.elements = elements
+        self.inline_positions = inline_positions
+        self.style_positions = style_positions
+        self.links = links
+        self.style_counts = Counter(inline_style.style for inline_style in inline_styles)
+
+    def inline_styles_for(self, tags):
+        """Return the distinct inline styles of elements with one of the given tag names."""
+        return list(dict.fromkeys(inline_style for inline_style in self.inline_styles if inline_style.tag in tags))
+
+
+def collect_style_sources(soup):
+    """Walk the tree once, collecting every style attribute with its tag and classes, every <style> tag and every stylesheet link."""
+    inline_styles = []
+    inline_positions = []
+    style_blocks = []
+    style_positions = []
+    links = []
+    elements = soup.find_all(True)
+    for position, element in enumerate(elements):
+        if element.name == 'style':
+            style_blocks.append(element.get_text())
+            style_positions.append(position)
+        elif element.name == 'link' and 'stylesheet' in (element.get('rel') or ()) and element.get('href'):
+            links.append((element.get('href'), position))
+        style = element.get('style')
+        if style:
+            inline_styles.append(InlineStyle(element.name, tuple(element.get('class') or ()), style))
+            inline_positions.append(position)
+    sources = StyleSources(inline_styles, style_blocks, elements, inline_positions, style_positions, links)
+    logging.debug(f"Collected {len(inline_styles)} inline styles ({len(sources.style_counts)} distinct) "
+                  f"and {len(style_blocks)} <style> tags")
+    return sources
+
+
+def get_style_sources(sources):
+    """Return sources as StyleSources, traversing it first when given a soup."""
+    if isinstance(sources, StyleSources):
+        return sources
+    return collect_style_sources(sources)
@@ -1,7 +1,9 @@
 from bs4 import BeautifulSoup
+from app.Controllers.Scraper.html_parser import ensure_soup
 import re
 
 def identify_technologies(soup):
+    soup = ensure_soup(soup)
     technologies = set()
     if soup.find('script', src=re.compile(r'react', re.IGNORECASE)):
         technologies.add('React')
@@ -1,6 +1,8 @@
 from bs4 import BeautifulSoup
+from app.Controllers.Scraper.html_parser import ensure_soup
 
 def get_website_name(soup, url):
+    soup = ensure_soup(soup)
     title_tag = soup.find('title')
     if title_tag:
         return title_tag.get_text().strip()
@@ -5,6 +5,7 @@ from app.Models.site_data import SiteData
 from app.Middleware.auth import token_required
 from datetime import datetime
 from app.Controllers.Scraper.scraper import scrape_website
+from app.Controllers.Scraper.deadline import Deadline
 from flask_cors import cross_origin
 from app.extensions import mongo
 from bson.objectid import ObjectId
@@ -16,7 +17,9 @@ def scrape():
     data = request.get_json()
     url = data.get('url')
     if url:
-        results = scrape_website(url)
+        # The time budget starts when the request arrives and covers every stage of the scrape
+        deadline = Deadline()
+        results = scrape_website(url, deadline)
         logging.info("Scraping results: %s", results)
         
         if results:
@@ -26,7 +29,10 @@ def scrape():
                 'contrast_ratio': results['processed_colors'].get('contrast', 0),
                 'harmony_score': results['processed_colors'].get('harmony', 0),
                 'best_trait': results['processed_colors'].get('best_trait', 'No dominant trait'),
-                'analysis': results.get('analysis', 'No analysis available')
+                'analysis': results.get('analysis', 'No analysis available'),
+                'truncated_resources': results.get('truncated_resources', {}),
+                'partial': results.get('partial', False),
+                'skipped_stages': results.get('skipped_stages', [])
             }
             logging.info("Response data prepared: %s", response_data)
             return jsonify(response_data), 200
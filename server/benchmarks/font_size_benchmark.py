@@ -0,0 +1,99 @@
+"""Compare the declaration parser with cssutils for font-size extraction.
+
+Usage, from the server directory:
+
+    python benchmarks/font_size_benchmark.py path/to/css_corpus --repeat 3
+    python benchmarks/font_size_benchmark.py --synthetic 2000
+
+Every *.css file in the corpus (or a generated stylesheet of N KiB) is run through both
+backends with the extraction cache bypassed. Reports the best total time per backend and how
+many font-size values each one found, so differences in what they accept stay visible.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.Controllers.Scraper.Fonts.declaration_index import build_declaration_index  # noqa: E402
+from app.Controllers.Scraper.Fonts.extractions.font_sizes import extract_font_sizes_from_index, extract_font_sizes_strict  # noqa: E402
+
+SYNTHETIC_RULE = (".component-{i} .title:hover, .component-{i} > a {{ font-size: {size}px; line-height: 1.{i}; "
+                  "color: #{i:06x}; background: url(data:image/png;base64,AAAA{i}); }}\n"
+                  "@media (max-width: {i}px) {{ .component-{i} {{ font-size: clamp(1rem, {size}vw, 3rem) !important; }} }}\n")
+
+
+def declaration_font_sizes(css_text):
+    return extract_font_sizes_from_index(build_declaration_index.__wrapped__(css_text))
+
+
+def cssutils_font_sizes(css_text):
+    return extract_font_sizes_strict.__wrapped__(css_text)
+
+
+BACKENDS = {
+    'cssutils': cssutils_font_sizes,
+    'declarations': declaration_font_sizes,
+}
+
+
+def load_corpus(directory):
+    sheets = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.lower().endswith('.css'):
+                with open(os.path.join(root, name), encoding='utf-8', errors='replace') as f:
+                    sheets.append((name, f.read()))
+    return sheets
+
+
+def synthetic_stylesheet(kib):
+    rules = []
+    size = 0
+    i = 0
+    while size < kib * 1024:
+        rule = SYNTHETIC_RULE.format(i=i, size=10 + i % 40)
+        rules.append(rule)
+        size += len(rule)
+        i += 1
+    return [(f'synthetic-{kib}KiB.css', ''.join(rules))]
+
+
+def time_backend(sheets, extract, repeat):
+    """Return the best total wall time over repeat runs and the number of distinct values found."""
+    best = None
+    found = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = sum(len(extract(css_text)) for _, css_text in sheets)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, found
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('corpus', nargs='?', help='directory of saved .css files')
+    arg_parser.add_argument('--synthetic', type=int, metavar='KIB', help='benchmark a generated stylesheet instead')
+    arg_parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=list(BACKENDS))
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    sheets = synthetic_stylesheet(args.synthetic) if args.synthetic else load_corpus(args.corpus or '.')
+    if not sheets:
+        sys.exit(f"No .css files found in {args.corpus}")
+    total_bytes = sum(len(css_text) for _, css_text in sheets)
+    print(f"{len(sheets)} stylesheets, {total_bytes / 1024 / 1024:.1f} MiB")
+    print(f"{'backend':<14}{'total s':>10}{'MiB/s':>10}{'values':>10}")
+
+    baseline = None
+    for backend in args.backends:
+        elapsed, found = time_backend(sheets, BACKENDS[backend], args.repeat)
+        baseline = baseline or elapsed
+        print(f"{backend:<14}{elapsed:>10.3f}{total_bytes / 1024 / 1024 / elapsed:>10.1f}{found:>10}"
+              f"   x{baseline / elapsed:.2f} vs {args.backends[0]}")
+
+
+if __name__ == '__main__':
+    main()
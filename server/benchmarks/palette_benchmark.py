@@ -0,0 +1,52 @@
+"""Time palette generation per backend on random weighted color histograms.
+
+Usage, from the server directory:
+
+    python benchmarks/palette_benchmark.py --sizes 20 100 1000
+    python benchmarks/palette_benchmark.py --backends median_cut kmeans --repeat 20
+
+Colors are drawn from a fixed seed, with a few heavily used brand colors and a long tail of
+rarely used ones, as on a typical page. Reports the mean milliseconds per palette and the
+palette itself, so backends can be compared by eye. The kmeans backend needs scikit-learn, from requirements-optional.txt.
+"""
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.Controllers.Scraper.Colors.processes.palette_creation import PALETTE_BACKENDS, ColorPaletteGenerator  # noqa: E402
+
+
+def sample_colors(size, seed=0):
+    """size random colors, with usage weights following a long tail."""
+    rng = random.Random(seed)
+    colors = [tuple(rng.randrange(256) for _ in range(3)) for _ in range(size)]
+    weights = [1000.0 / (rank + 1) for rank in range(size)]
+    return colors, weights
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--sizes', nargs='+', type=int, default=[20, 100, 1000])
+    arg_parser.add_argument('--backends', nargs='+', default=['median_cut'], choices=list(PALETTE_BACKENDS))
+    arg_parser.add_argument('--repeat', type=int, default=200)
+    args = arg_parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"{'backend':<12}{'colors':>8}{'ms':>10}  palette")
+    for backend in args.backends:
+        for size in args.sizes:
+            colors, weights = sample_colors(size)
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                palette = ColorPaletteGenerator(colors, weights=weights, backend=backend).generate_palette()
+            elapsed = (time.perf_counter() - start) / args.repeat * 1000
+            print(f"{backend:<12}{size:>8}{elapsed:>10.3f}  {' '.join(palette)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Compare HTML parser backends on a directory of saved pages.
+
+Usage, from the server directory:
+
+    python benchmarks/parse_benchmark.py path/to/page_corpus --repeat 5
+
+Every *.html / *.htm file in the corpus is parsed with each backend. Reports total and per-page
+parse time and the peak Python heap seen by tracemalloc while parsing. tracemalloc does not see
+libxml2's own C allocations, but the BeautifulSoup tree it builds lives on the Python heap and
+dominates peak memory for both backends.
+
+With --partial every backend is also measured in partial-parse mode (SCRAPER_PARTIAL_PARSE),
+which only builds the style-relevant nodes the scraper reads.
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.Controllers.Scraper.html_parser import parse_html, parse_partial_html  # noqa: E402
+
+DEFAULT_PARSERS = ('html.parser', 'lxml')
+
+
+def load_corpus(directory):
+    pages = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.lower().endswith(('.html', '.htm')):
+                with open(os.path.join(root, name), 'rb') as f:
+                    pages.append((name, f.read()))
+    return pages
+
+
+def time_parser(pages, parser, repeat, parse=parse_html):
+    """Return the best total wall time over repeat runs, so one noisy run does not skew the result."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _, content in pages:
+            parse(content, parser)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def peak_memory(pages, parser, parse=parse_html):
+    """Return the largest tracemalloc peak seen while parsing any single page, in bytes."""
+    worst = 0
+    for _, content in pages:
+        tracemalloc.start()
+        soup = parse(content, parser)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del soup
+        worst = max(worst, peak)
+    return worst
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('corpus', help='directory of saved .html pages')
+    arg_parser.add_argument('--parsers', nargs='+', default=list(DEFAULT_PARSERS))
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    arg_parser.add_argument('--partial', action='store_true', help='also measure partial-parse mode')
+    args = arg_parser.parse_args()
+
+    pages = load_corpus(args.corpus)
+    if not pages:
+        sys.exit(f"No .html files found in {args.corpus}")
+    total_bytes = sum(len(content) for _, content in pages)
+    print(f"{len(pages)} pages, {total_bytes / 1024 / 1024:.1f} MiB")
+    print(f"{'parser':<18}{'total s':>10}{'ms/page':>10}{'MiB/s':>10}{'peak MiB':>10}")
+
+    runs = [(parser, parser, parse_html) for parser in args.parsers]
+    if args.partial:
+        runs += [(f"{parser}/partial", parser, parse_partial_html) for parser in args.parsers]
+
+    baseline = None
+    for label, parser, parse in runs:
+        elapsed = time_parser(pages, parser, args.repeat, parse)
+        peak = peak_memory(pages, parser, parse)
+        baseline = baseline or elapsed
+        print(f"{label:<18}{elapsed:>10.3f}{elapsed / len(pages) * 1000:>10.1f}"
+              f"{total_bytes / 1024 / 1024 / elapsed:>10.1f}{peak / 1024 / 1024:>10.1f}"
+              f"   x{baseline / elapsed:.2f} vs {args.parsers[0]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Time the CSS extraction engine on pathological inputs.
+
+Usage, from the server directory:
+
+    python benchmarks/regex_benchmark.py --sizes 10000 100000 1000000
+    python benchmarks/regex_benchmark.py --legacy --sizes 5000 20000
+
+Each case is a generated input built to trigger catastrophic backtracking in the regexes the
+extractors used before, such as long word runs without a ':', unclosed rgba( and
+linear-gradient( calls, or whitespace runs before !important. The current engine is timed on
+every case and size; time growing roughly with size means the case stays linear. --legacy
+also times the old patterns, which grow quadratically, so keep its sizes small.
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.Controllers.Scraper.css_parser import iter_declarations  # noqa: E402
+from app.Controllers.Scraper.style_sources import StyleSources  # noqa: E402
+from app.Controllers.Scraper.Colors.extractions.color_literals import scan_color_literals  # noqa: E402
+from app.Controllers.Scraper.Colors.extractions.gradient_colors import extract_gradient_colors_from_literals  # noqa: E402
+from app.Controllers.Scraper.Colors.extractions.opacity_levels import extract_opacity_levels  # noqa: E402
+from app.Controllers.Scraper.Colors.extractions.shadows_overlays import extract_shadows_and_overlays  # noqa: E402
+from app.Controllers.Scraper.Fonts.declaration_index import build_declaration_index  # noqa: E402
+
+# name -> function building an input of roughly n characters
+CASES = {
+    'word run without colon': lambda n: 'a{' + 'x' * n + '}',
+    'unclosed gradients': lambda n: 'a{background:' + 'linear-gradient(' * (n // 16) + '}',
+    'unclosed rgba calls': lambda n: 'a{color:' + 'rgba(' * (n // 5) + '}',
+    'unclosed overlay calls': lambda n: 'a{' + 'background: rgba(' * (n // 17) + '}',
+    'spaces before !important': lambda n: 'a{font-size:1px' + ' ' * n + 'x}',
+    'unclosed comment': lambda n: 'a{color:#fff}/*' + 'x' * n,
+    'unclosed string': lambda n: 'a{content:"' + 'x' * n + '}',
+    'deep nesting': lambda n: '@media x{' * (n // 18) + 'a{color:#fff}' + '}' * (n // 18),
+    'huge selector list': lambda n: ','.join('.c%d:hover' % i for i in range(n // 10)) + '{color:#000}',
+}
+
+LEGACY_PATTERNS = {
+    'declaration': re.compile(r'([-\w]+)\s*:\s*((?:[^;("\']|\([^)]*\)?|"[^"]*"?|\'[^\']*\'?)*)'),
+    'gradient': re.compile(r'linear-gradient\s*\(([^)]+)\)', re.IGNORECASE),
+    'rgba': re.compile(r'rgba\([^)]+\)', re.IGNORECASE),
+    'overlay': re.compile(r'background:\s*rgba\([^)]+\)', re.IGNORECASE),
+    'important': re.compile(r'\s*!\s*important\s*$', re.IGNORECASE),
+}
+
+
+def run_engine(css_text):
+    """Run every extractor that reads raw CSS, with the extraction cache bypassed."""
+    list(iter_declarations(css_text))
+    literals = scan_color_literals.__wrapped__(css_text)
+    extract_gradient_colors_from_literals(literals)
+    build_declaration_index.__wrapped__(css_text)
+    sources = StyleSources([], [css_text])
+    extract_opacity_levels(sources)
+    extract_shadows_and_overlays(sources)
+
+
+def run_legacy(css_text):
+    for pattern in LEGACY_PATTERNS.values():
+        list(pattern.finditer(css_text))
+
+
+def timed(function, css_text):
+    start = time.process_time()
+    function(css_text)
+    return time.process_time() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--sizes', nargs='+', type=int, default=[10000, 100000, 1000000])
+    arg_parser.add_argument('--cases', nargs='+', default=list(CASES), choices=list(CASES))
+    arg_parser.add_argument('--legacy', action='store_true', help='also time the old backtracking patterns')
+    args = arg_parser.parse_args()
+
+    print(f"{'case':<28}{'chars':>10}{'engine s':>10}" + (f"{'legacy s':>10}" if args.legacy else ''))
+    for case in args.cases:
+        for size in args.sizes:
+            css_text = CASES[case](size)
+            line = f"{case:<28}{len(css_text):>10}{timed(run_engine, css_text):>10.3f}"
+            if args.legacy:
+                line += f"{timed(run_legacy, css_text):>10.3f}"
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 from app import create_app
 
-app = create_app()
-
 if __name__ == "__main__":
+    # Built only when run directly: extraction pool workers (forkserver/spawn) re-import this
+    # file as __mp_main__ and must not create the app or connect to MongoDB
+    app = create_app()
     app.run(debug=True)